@@ -0,0 +1,104 @@
+# acquisition_benchmark.py
+# Run the full start_*_analysis sequences against the simulated camera and
+# serial backends and report where the time goes. No rig or display needed.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+SEQUENCES = ("comminution", "mixing", "mixing_2")
+
+
+def build_controller(config, images=None, grab_latency=None, ack_delay=None):
+    from controller.main_controller import MainController
+
+    config["backends"]["camera"] = "simulated"
+    config["backends"]["serial"] = "simulated"
+    simulated = config["backends"]["simulated"]
+    if images is not None:
+        simulated["images"] = images
+    if grab_latency is not None:
+        simulated["grab_latency"] = grab_latency
+    if ack_delay is not None:
+        simulated["ack_delay"] = ack_delay
+
+    # Simulated dish circles and results must never end up in the rig's calibration or cache
+    scratch = tempfile.mkdtemp(prefix="pmes-acq-bench-")
+    config["calibration"]["path"] = os.path.join(scratch, "calibration.yaml")
+    config["cache"]["path"] = os.path.join(scratch, "results")
+
+    controller = MainController(config)
+    # Message boxes would block the offscreen event loop; log them instead
+    view = controller.main_view
+    view.show_error = lambda msg: print(f"[ERROR] {msg}")
+    view.show_warning = lambda msg: print(f"[WARNING] {msg}")
+    view.show_info = lambda msg: print(f"[INFO] {msg}")
+
+    view.online_radio.setChecked(True)
+    controller.connect_serial()
+    return controller
+
+
+def run_sequence(controller, name):
+    """Wall time of one sequence and its acquisition timeline."""
+    method = {
+        "comminution": controller.start_comminution_analysis,
+        "mixing": controller.start_mixing_analysis,
+        "mixing_2": controller.start_mixing_analysis_2,
+    }[name]
+
+    controller.last_timeline = None
+    start = time.perf_counter()
+    method()
+    elapsed = time.perf_counter() - start
+    if controller.last_timeline is None:
+        raise RuntimeError(f"The {name} sequence did not finish its acquisition")
+    return elapsed, controller.last_timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark acquisition sequences on simulated hardware.")
+    parser.add_argument("--config", default="configs/config.yaml")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--sequence", choices=SEQUENCES, action="append", help="default: all of them")
+    parser.add_argument("--images", help="folder or glob of images served by the simulated camera")
+    parser.add_argument("--grab-latency", type=float, help="seconds per simulated grab")
+    parser.add_argument("--ack-delay", type=float, help="seconds before the simulated firmware answers")
+    parser.add_argument("--no-settle", action="store_true", help="use the fixed delay_time instead of settle detection")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from configs.load_config import load_config
+
+    app = QApplication(sys.argv)
+    config = load_config(path=args.config)
+    if args.no_settle:
+        config["timing"]["settle_detection"] = False
+    controller = build_controller(config, args.images, args.grab_latency, args.ack_delay)
+
+    try:
+        for name in args.sequence or SEQUENCES:
+            walls, acquisitions, per_kind = [], [], {}
+            for _ in range(args.runs):
+                elapsed, timeline = run_sequence(controller, name)
+                walls.append(elapsed)
+                acquisitions.append(timeline.total)
+                for kind, seconds in timeline.totals().items():
+                    per_kind.setdefault(kind, []).append(seconds)
+
+            print(
+                f"{name}: {statistics.median(walls):.3f} s per run, "
+                f"acquisition {statistics.median(acquisitions):.3f} s (median of {args.runs})"
+            )
+            for kind, seconds in per_kind.items():
+                print(f"  {kind:<12} {statistics.median(seconds):8.3f} s")
+    finally:
+        controller.shutdown()
+        app.quit()
+
+
+if __name__ == "__main__":
+    main()
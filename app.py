@@ -1,13 +1,32 @@
 # app.py
+import time
+
+# Reference point for the time-to-first-paint measurement of startup_benchmark.py
+STARTUP_T0 = time.perf_counter()
+
+import os
 import sys
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 from controller.main_controller import MainController
 from configs.load_config import load_config
 
+
+def report_first_paint(app):
+    print(f"[STARTUP] first paint {time.perf_counter() - STARTUP_T0:.3f} s", flush=True)
+    app.quit()
+
+
 def main():
     app = QApplication(sys.argv)
     config = load_config(path="configs/config.yaml")
     controller = MainController(config)
+    app.aboutToQuit.connect(controller.shutdown)
+
+    if os.environ.get("PMES_STARTUP_BENCHMARK"):
+        # Runs on the first event-loop turn, once the shown window has been painted
+        QTimer.singleShot(0, lambda: report_first_paint(app))
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
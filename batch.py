@@ -0,0 +1,48 @@
+# batch.py
+# Headless re-analysis of a saved_data tree: no Qt, camera or serial imports.
+import argparse
+
+from configs.load_config import load_config
+from controller.src.batch_analysis import KINDS, run_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze every image saved under a saved_data folder.")
+    parser.add_argument("--root", default="saved_data", help="saved_data folder to walk")
+    parser.add_argument("--output", default="batch_results.csv", help="result file (.csv or .parquet)")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--budget", type=float, default=120.0, help="seconds allowed per image, 0 = no limit")
+    parser.add_argument("--retry-failed", action="store_true", help="re-analyze images that errored or timed out")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the result cache")
+    parser.add_argument("--config", default="configs/config.yaml")
+    args = parser.parse_args()
+
+    config = load_config(path=args.config)
+    radius_mm = config["disk_ref"]["radius_mm"]
+
+    summary = run_batch(
+        root=args.root,
+        output=args.output,
+        kinds=args.kinds,
+        workers=args.workers,
+        budget=args.budget,
+        retry_failed=args.retry_failed,
+        radius_mm=radius_mm,
+        fallback_pixel_size_mm=radius_mm / config["disk_ref"]["radius_px"],
+        cache_dir=None if args.no_cache else config["cache"]["path"],
+        cache_max_bytes=config["cache"]["max_size_mb"] * 1024**2,
+        calibration_path=config["calibration"]["path"],
+    )
+
+    print(
+        f"{summary['images']} images in {summary['seconds']:.1f} s "
+        f"({summary['images_per_second']:.2f} images/s): "
+        f"{summary['ok']} ok, {summary['timeout']} timed out, {summary['error']} failed"
+    )
+    for kind, seconds in summary["mean_seconds"].items():
+        print(f"  {kind}: {seconds:.2f} s per image")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,46 @@
 # controller/main_controller.py
-from model.serial_model import SerialModel
-from model.camera_model import CameraModel
-from view.main_window import MainWindow
-from view.settings_window import SettingsWindow
-from view.dev_window import DevWindow
-import time
-import cv2
-import numpy as np
+import importlib
 import os
+import threading
+import time
 
-from controller.src.comminution.segment_particle import segment_particles
-from controller.src.comminution.density_analysis import analyze_particle_density
-from controller.src.mixing.hsv_segmentation import hsv_segmentation
-from controller.src.mixing.histogram import get_hsv_histogram_figure
-from controller.src.mixing.h_indices_compute import compute_hue
+from view.main_window import MainWindow
+
+# Analysis and hardware modules are imported on first use so the main window
+# shows without waiting for OpenCV, NumPy, pypylon or pyserial. These are
+# warmed up on a background thread once the window is up.
+PRELOAD_MODULES = (
+    "cv2",
+    "numpy",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+    "controller.src.calibration",
+    "controller.src.result_cache",
+    "controller.src.comminution.segment_particle",
+    "controller.src.comminution.density_analysis",
+    "controller.src.comminution.size_accumulator",
+    "controller.src.mixing.hsv_segmentation",
+    "controller.src.mixing.histogram",
+    "controller.src.mixing.frame_context",
+    "controller.src.mixing.mixing_metrics",
+    "controller.src.mixing.multi_view",
+)
+
+
+def preload_modules(names=PRELOAD_MODULES):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"[DEBUG] Preloading {name} failed: {e}")
 
 
 class MainController:
     def __init__(self, config="configs/config.yaml"):
         self.main_view = MainWindow()
-        self.settings_view = SettingsWindow()
-        self.dev_view = DevWindow()
+        # Settings and dev windows are built (and their .ui parsed) when first opened
+        self._settings_view = None
+        self._dev_view = None
 
         # Load hyperparameters for camera
         self.camera_config = {
@@ -31,19 +51,45 @@ class MainController:
             "gain": config["camera"]["gain"],
             "gain_auto": config["camera"]["gain_auto"],
             "whitebalance_auto": config["camera"]["whitebalance_auto"],
+            "raw_bayer": config["camera"]["raw_bayer"],
         }
+        # Sensor ROI cropped to the calibrated dish, per motor position
+        self.dish_roi = config["camera"]["dish_roi"]
+        self.roi_margin_px = config["camera"]["roi_margin_px"]
+        # ROI each sequence's captures were taken with (None = full sensor)
+        self.capture_rois = {"comminution": None, "mixing": None, "mixing_2": None}
+        self.camera_profiles = config["camera_profiles"]
         self.config = config
 
+        # Camera/serial implementations; the simulated ones share one rig state
+        self.backends = config["backends"]
+        self._simulated_rig = None
+
         # Load hyperparameters for serial
         self.delay_time = config["serial"]["delay_time"]
+        self.ack_timeout = config["serial"]["ack_timeout"]
+
+        # Settle detection replacing the fixed delay_time between acquisition steps
+        self.timing = config["timing"]
+        self.last_timeline = None
 
         # Load paramtter for pixel_size_mm
         self.radius_mm = config["disk_ref"]["radius_mm"]
         self.radius_px = config["disk_ref"]["radius_px"]
         self.pixel_size_mm = self.radius_mm / self.radius_px
 
+        # Number of strips segmentation is split into across threads (0 = untiled)
+        self.segmentation_tiles = config["analysis"]["segmentation_tiles"]
+
+        # Cached dish geometry per motor position, re-detected only when it stops fitting
+        self._calibration = None
+
+        # Finished analyses keyed by image content and parameters, for instant re-runs
+        self._result_cache = None
+
         # Develop button events of main_window
         self.serial_model = None
+        self.camera_model = None
         self.main_view.connect_btn.clicked.connect(self.connect_serial)
         self.main_view.setting_btn.clicked.connect(self.open_settings)
         self.main_view.analyze_comminution_btn.clicked.connect(
@@ -52,20 +98,25 @@ class MainController:
         self.main_view.analyze_mixing_btn.clicked.connect(self.start_mixing_analysis)
         self.main_view.analyze_mixing_btn_2.clicked.connect(self.start_mixing_analysis_2)
         self.main_view.dev_btn.clicked.connect(self.open_dev_window)
+        self.main_view.preview_btn.toggled.connect(self.toggle_live_preview)
 
-        # Develop button events of settings_window
-        self.settings_view.send_led_button.connect(self.send_led_pattern)
-        self.settings_view.slider_released.connect(self.handle_slider_change)
-        self.settings_view.closeEvent = self.on_settings_close
+        # Live preview of the camera while positioning the dish
+        self.preview_fps = config["preview"]["target_fps"]
+        self.live_preview = None
+        self._preview_timer = None
 
-        # Develop button events of dev_window
-        self.dev_view.send_led_button.connect(self.send_led_pattern)
-        self.dev_view.move_motor_btn.clicked.connect(self.send_motor_position_dev)
+        # Chewing-bolus video recording
+        self.main_view.record_btn.toggled.connect(self.toggle_recording)
+        self.recording_config = config["recording"]
+        self.recorder = None
 
         self.main_view.show()
 
+        threading.Thread(target=preload_modules, daemon=True).start()
+
         ### Variable for saving
         self.comminution_data = None
+        self.comminution_size_summary = None
         self.mixing_data_main_side_1 = None
         self.mixing_data_side_1_1 = None
         self.mixing_data_side_2_1 = None
@@ -78,30 +129,320 @@ class MainController:
         self.mixing_data_side_3_2 = None
         self.mixing_data_side_4_2 = None
 
+        # Per-view and aggregated metrics of the last mixing analysis
+        self.mixing_view_metrics = None
+
+    @property
+    def settings_view(self):
+        if self._settings_view is None:
+            from view.settings_window import SettingsWindow
+
+            self._settings_view = SettingsWindow()
+
+            # Develop button events of settings_window
+            self._settings_view.send_led_button.connect(self.send_led_pattern)
+            self._settings_view.slider_released.connect(self.handle_slider_change)
+            self._settings_view.closeEvent = self.on_settings_close
+        return self._settings_view
+
+    @property
+    def dev_view(self):
+        if self._dev_view is None:
+            from view.dev_window import DevWindow
+
+            self._dev_view = DevWindow()
+
+            # Develop button events of dev_window
+            self._dev_view.send_led_button.connect(self.send_led_pattern)
+            self._dev_view.move_motor_btn.clicked.connect(self.send_motor_position_dev)
+        return self._dev_view
+
+    @property
+    def result_cache(self):
+        if self._result_cache is None:
+            from controller.src.result_cache import ResultCache
+
+            self._result_cache = ResultCache(
+                self.config["cache"]["path"],
+                max_bytes=self.config["cache"]["max_size_mb"] * 1024**2,
+            )
+        return self._result_cache
+
+    @property
+    def calibration(self):
+        if self._calibration is None:
+            from controller.src.calibration import DishCalibration
+
+            self._calibration = DishCalibration(
+                self.config["calibration"]["path"], radius_mm=self.radius_mm
+            )
+        return self._calibration
+
+    @property
+    def simulated_rig(self):
+        if self._simulated_rig is None:
+            from model.backends import create_rig
+
+            self._simulated_rig = create_rig(self.backends["simulated"])
+        return self._simulated_rig
+
+    def _backend_options(self, backend):
+        if backend != "simulated":
+            return {}
+        return {"simulated": self.backends["simulated"], "rig": self.simulated_rig}
+
+    def open_camera(self):
+        """The controller's camera session, opened once and kept streaming between shots."""
+        if self.camera_model is None or not self.camera_model.is_open():
+            from model.backends import create_camera
+
+            backend = self.backends["camera"]
+            self.camera_model = create_camera(
+                backend, **self._backend_options(backend), **self.camera_config
+            )
+            if self.camera_model.is_open():
+                for name, settings in self.camera_profiles.items():
+                    self.camera_model.define_profile(name, **settings)
+                self.camera_model.start_session("trigger")
+        return self.camera_model
+
+    def use_dish_roi(self, position):
+        """
+        Crop the sensor to the calibrated dish at this motor position and return the ROI.
+        Until the position is calibrated (or with dish_roi off) the full sensor is used.
+        """
+        from model.camera_roi import dish_roi
+        from controller.src.mixing.cv_ab import LOCAL_VARIANCE_BLOCK
+
+        roi = None
+        circle = self.calibration.circle(position)
+        if self.dish_roi and circle is not None:
+            roi = dish_roi(
+                circle,
+                (self.camera_config["width"], self.camera_config["height"]),
+                margin=self.roi_margin_px,
+                increments=self.camera_model.roi_increments(),
+                block_size=LOCAL_VARIANCE_BLOCK,
+            )
+        self.camera_model.set_roi(roi)
+        return roi
+
+    def drop_dish_roi(self, position, error):
+        """The dish left its ROI: warn and forget the calibration, so the rerun captures the full sensor."""
+        self.main_view.show_warning(f"{error} Recapturing at full sensor.")
+        self.calibration.forget(position)
+
+    def full_frame(self, img, sequence):
+        """A capture as a full-sensor BGR frame, for saving in the usual layout."""
+        from model.camera_roi import pad_to_sensor
+        from model.raw_frame import as_bgr
+
+        sensor_size = (self.camera_config["width"], self.camera_config["height"])
+        return pad_to_sensor(as_bgr(img), self.capture_rois[sequence], sensor_size)
+
+    def start_timeline(self):
+        """New timeline for an acquisition sequence; serial round trips are recorded into it."""
+        from controller.src.acquisition_timing import AcquisitionTimeline
+
+        timeline = AcquisitionTimeline()
+        self.serial_model.timeline = timeline
+        return timeline
+
+    def finish_timeline(self, timeline, completed=True):
+        """Detach the timeline from the serial port; a completed acquisition is logged and kept as last_timeline."""
+        self.serial_model.timeline = None
+        timeline.print_steps()
+        if completed:
+            self.last_timeline = timeline
+            self.main_view.append_log(timeline.summary())
+
+    def capture_settled(self, timeline, name):
+        """
+        Capture a frame once the scene has settled after a motor move or LED change.
+
+        Frames are grabbed until brightness and motion are stable (the last one is
+        the capture). Without settle detection, or without a trigger session, the
+        fixed delay_time is used instead.
+        """
+        if not self.timing["settle_detection"] or self.camera_model.session_mode is None:
+            with timeline.step(f"wait {name}"):
+                time.sleep(self.delay_time)
+            with timeline.step(f"capture {name}"):
+                return self.camera_model.capture_image()
+
+        from controller.src.acquisition_timing import wait_for_stable_frame
+
+        with timeline.step(f"settle {name}") as info:
+            img, stable, frames = wait_for_stable_frame(
+                self.camera_model.grab_next,
+                timeout=self.timing["settle_timeout"],
+                brightness_tolerance=self.timing["brightness_tolerance"],
+                motion_tolerance=self.timing["motion_tolerance"],
+            )
+            info.update(frames=frames, stable=stable)
+
+        if not stable:
+            self.main_view.append_log(f"Warning: {name} did not settle within {self.timing['settle_timeout']} s.")
+        return img
+
+    def preview_label(self):
+        """Capture label of the current tab, where the live preview is drawn."""
+        labels = (
+            self.main_view.comminution_segment_pb,
+            self.main_view.mixing_capture_pb,
+            self.main_view.mixing_capture_pb_2,
+        )
+        return labels[min(self.main_view.tabWidget.currentIndex(), len(labels) - 1)]
+
+    def toggle_live_preview(self, checked):
+        if checked:
+            self.start_live_preview()
+        else:
+            self.stop_live_preview()
+
+    def start_live_preview(self):
+        from PyQt6.QtCore import QTimer
+
+        camera = self.open_camera()
+        if not camera.is_open():
+            self.main_view.show_error("Camera is not connected.")
+            self.main_view.preview_btn.setChecked(False)
+            return
+
+        self.stop_recording()
+        # Positioning the dish needs the whole field of view
+        camera.set_roi(None)
+        label = self.preview_label()
+        self.live_preview = camera.record_video(
+            size=(label.width(), label.height()), target_fps=self.preview_fps
+        )
+        # The GUI only polls the one-frame slot, it never waits for the camera
+        self._preview_timer = QTimer(self.main_view)
+        self._preview_timer.timeout.connect(self.show_preview_frame)
+        self._preview_timer.start(int(1000 / self.preview_fps))
+        self.main_view.append_log("Live preview started.")
+
+    def show_preview_frame(self):
+        frame = self.live_preview.slot.take() if self.live_preview is not None else None
+        if frame is not None:
+            self.main_view.visualize_image(frame, self.preview_label())
+
+    def stop_live_preview(self):
+        if self.live_preview is None:
+            return
+        self._preview_timer.stop()
+        self._preview_timer = None
+        preview, self.live_preview = self.live_preview, None
+        preview.stop()
+
+        stats = preview.stats()
+        self.main_view.append_log(
+            f"Live preview stopped: {stats['grabbed']} frames grabbed, {stats['shown']} shown, "
+            f"{stats['dropped']} dropped ({stats['fps']:.1f} fps)."
+        )
+        self.main_view.preview_btn.setChecked(False)
+
+    def toggle_recording(self, checked):
+        if checked:
+            self.start_recording()
+        else:
+            self.stop_recording()
+
+    def start_recording(self):
+        try:
+            name = self.main_view.get_name()
+            gender = self.main_view.get_gender()
+            age = self.main_view.get_age()
+        except ValueError as e:
+            self.main_view.show_error(str(e))
+            self.main_view.record_btn.setChecked(False)
+            return
+
+        # The preview and the recording cannot share the camera stream
+        self.stop_live_preview()
+        camera = self.open_camera()
+        if not camera.is_open():
+            self.main_view.show_error("Camera is not connected.")
+            self.main_view.record_btn.setChecked(False)
+            return
+
+        camera.set_roi(None)
+        video_path = os.path.join(
+            "saved_data", "videos", f"{name}_{gender}_{age}", time.strftime("%Y%m%d_%H%M%S")
+        )
+        self.recorder = camera.record_video(
+            path=video_path,
+            container=self.recording_config["container"],
+            ring_frames=self.recording_config["ring_frames"],
+            target_fps=self.recording_config["fps"],
+        )
+        self.main_view.append_log(f"Recording to {video_path} ...")
+
+    def stop_recording(self):
+        if self.recorder is None:
+            return
+        recorder, self.recorder = self.recorder, None
+        stats = recorder.stop()
+
+        self.main_view.append_log(
+            f"Recording stopped: {stats['written']} frames written, {stats['dropped']} dropped, "
+            f"{stats['fps']:.1f} fps, {stats['mb_per_s']:.0f} MB/s."
+        )
+        if recorder.error:
+            self.main_view.show_error(f"Recording failed: {recorder.error}")
+        self.main_view.record_btn.setChecked(False)
+
+    def shutdown(self):
+        """Release the camera and worker processes when the application quits."""
+        self.stop_live_preview()
+        self.stop_recording()
+        if self.camera_model is not None:
+            self.camera_model.close()
+            self.camera_model = None
+        from controller.src.mixing.multi_view import shutdown_view_pool
+
+        shutdown_view_pool()
+
     def start_comminution_analysis(self):
+        import cv2
+        from controller.src.comminution.segment_particle import segment_particles
+        from controller.src.comminution.density_analysis import (
+            particle_size_distribution,
+            plot_particle_density,
+        )
+        from controller.src.dish_detection import DISH_PROFILES
+        from controller.src.comminution.size_accumulator import SizeDistributionAccumulator
+        from controller.src.calibration import DishOutsideRoi
+        from model.raw_frame import as_bgr
 
         self.main_view.append_log("Starting comminution analysis...")
+        roi = None
 
         if self.main_view.online_radio.isChecked():
             if self.serial_model is None:
                 self.main_view.show_warning("Please connect to serial port first.")
                 return
+            # The sequence needs the camera in trigger mode
+            self.stop_live_preview()
+            self.stop_recording()
             self.main_view.setEnabled(False)
+            timeline = self.start_timeline()
+            completed = False
             try:
                 self.main_view.append_log("Initialize camera with config ... ")
-                self.camera_model = CameraModel(**self.camera_config)
+                self.camera_model = self.open_camera()
+                self.camera_model.use_profile("main")
+                roi = self.capture_rois["comminution"] = self.use_dish_roi("comminution")
                 # Move motor to position to capture image
                 self.serial_model.send_and_wait_ok("motor 0\n")
-                time.sleep(self.delay_time)
                 # Turn on 5 LED for comminution analysis
 
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 1 0 0 0 1 0 0 0 1 0 0 0 0\n"
                 )
-                time.sleep(self.delay_time)
                 # //////////////////////////////////
                 # PUT CODE TO CAPTURE THE IMAGE HERE
-                img_data = self.camera_model.capture_image()
+                img_data = self.capture_settled(timeline, "comminution")
                 self.comminution_data = img_data
                 
                 # /////////////////////////////////
@@ -114,16 +455,17 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 1 0 0 0 1 0 0 0 1 0 0 0 0\n"
                 )
-                time.sleep(self.delay_time)
-
-                # Release camera resources
-                self.camera_model.close()
 
+                completed = True
                 self.main_view.setEnabled(True)
 
             except Exception as e:
                 self.main_view.show_error(str(e))
                 self.main_view.setEnabled(True)
+                # Nothing was captured to analyze
+                return
+            finally:
+                self.finish_timeline(timeline, completed)
 
         if self.main_view.local_radio.isChecked():
             img_path = self.main_view.open_file_dialog()
@@ -133,61 +475,104 @@ class MainController:
                 return
 
         try:
-            segment_img, raw_crop, mask_s, contours = segment_particles(img_data)
+            # Raw Bayer captures are demosaiced only now, after the acquisition
+            img_data = as_bgr(img_data)
+            # Images loaded from disk must not overwrite the rig calibration
+            circle = self.calibration.resolve(
+                img_data, "comminution", roi=roi, store=not self.main_view.local_radio.isChecked()
+            )
+            pixel_size_mm = self.calibration.pixel_size_mm(
+                "comminution", default=self.pixel_size_mm
+            )
+
+            key = self.result_cache.key(
+                img_data,
+                "comminution",
+                thresh_s=54,
+                hough=DISH_PROFILES["comminution"],
+                circle=circle,
+                pixel_size_mm=pixel_size_mm,
+            )
+            cached = self.result_cache.get(key)
+            if cached is None:
+                segment_img, raw_crop, mask_s, contours, particles = segment_particles(
+                    img_data,
+                    pixel_size_mm=pixel_size_mm,
+                    circle=circle,
+                    tiles=self.segmentation_tiles,
+                )
+                distribution = particle_size_distribution(particles, log_scale=None)
+                self.result_cache.put(key, {
+                    "segment_img": segment_img,
+                    "mask_s": mask_s,
+                    "particles": particles,
+                    "distribution": distribution,
+                })
+            else:
+                self.main_view.append_log("Comminution result loaded from cache.")
+                segment_img = cached["segment_img"]
+                particles = cached["particles"]
+                distribution = cached["distribution"]
 
             self.main_view.visualize_image(
                 segment_img, self.main_view.comminution_segment_pb
             )
 
-            density_area = [] 
-            for i, cnt in enumerate(contours):
-                particle_mask = np.zeros(mask_s.shape, dtype=np.uint8)
-                cv2.drawContours(particle_mask, [cnt], -1, 255, -1)
-                area = cv2.countNonZero(particle_mask)
-                density_area.append(area)
-
-            density_area = np.asarray(density_area)
-            areas_mm2 = density_area * (self.pixel_size_mm ** 2)
-            eq_diameter_mm = 2.0 * np.sqrt(areas_mm2 / np.pi)
-
             self.main_view.update_particle_size_stats_ranges(
-                eq_diameter_mm, self.main_view.particle_size_stats_box, bin_size=0.01
+                particles, self.main_view.particle_size_stats_box, bin_size=0.01
             )
 
-            fig, D10, D50, D90 = analyze_particle_density(eq_diameter_mm, log_scale=None)
+            fig = plot_particle_density(distribution)
+            D10, D50, D90 = distribution["D10"], distribution["D50"], distribution["D90"]
+
+            # Compact, mergeable summary so replicates can be pooled later
+            self.comminution_size_summary = SizeDistributionAccumulator().add(particles)
 
             self.main_view.visualize_figure(fig, self.main_view.comminution_analysis_pb)
             self.main_view.d10_box.setText(f"{D10:.4f} mm")
             self.main_view.d50_box.setText(f"{D50:.4f} mm")
             self.main_view.d90_box.setText(f"{D90:.4f} mm")
 
+        except DishOutsideRoi as e:
+            self.drop_dish_roi("comminution", e)
+            self.start_comminution_analysis()
+
         except Exception as e:
             self.main_view.show_error(str(e))
 
     def start_mixing_analysis(self):
+        import cv2
+        from controller.src.mixing.multi_view import side_view_paths
+        from controller.src.calibration import DishOutsideRoi
+
         self.main_view.append_log("Starting mixing analysis...")
+        roi = None
 
         if self.main_view.online_radio.isChecked():
+            if self.serial_model is None:
+                self.main_view.show_warning("Please connect to serial port first.")
+                return
+            # The sequence needs the camera in trigger mode
+            self.stop_live_preview()
+            self.stop_recording()
+            self.main_view.setEnabled(False)
+            timeline = self.start_timeline()
+            completed = False
             try:
-                if self.serial_model is None:
-                    self.main_view.show_warning("Please connect to serial port first.")
-                    return
-                self.main_view.setEnabled(False)
-
                 # Move motor to position to capture image
                 self.serial_model.send_and_wait_ok("motor 140\n")
-                time.sleep(self.delay_time)
 
                 # Turn on the led region 1 for mixing analysis
-                self.camera_model = CameraModel(**self.camera_config)
+                self.camera_model = self.open_camera()
+                self.camera_model.use_profile("main")
+                roi = self.capture_rois["mixing"] = self.use_dish_roi("mixing")
 
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 1 0 0 0 1 0 0 0 1 0 0 0 0\n"
                 )
-                time.sleep(self.delay_time)
                 # //////////////////////////////////
                 # PUT CODE TO CAPTURE THE IMAGE 1 HERE
-                img_data = self.camera_model.capture_image()
+                img_data = self.capture_settled(timeline, "main")
                 # # /////////////////////////////////
                 if img_data is None:
                     self.main_view.show_error("Failed to capture image from camera.")
@@ -199,17 +584,14 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 1 0 0 0 1 0 0 0 1 0 0 0 0\n"
                 )
-                time.sleep(self.delay_time)
-
-                # Release camera resources
-                self.camera_model.close()
 
-                self.camera_config["exposure_time"] = 15000
+                # Side-lit shots need the longer exposure; switched without reopening the camera
+                self.camera_model.use_profile("side")
 
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0\n"
                 )
-                img_data_1 = self.camera_model.capture_image()
+                img_data_1 = self.capture_settled(timeline, "side 1")
                 self.mixing_data_side_1_1 = img_data_1
 
                 self.serial_model.send_and_wait_ok(
@@ -219,7 +601,7 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0\n"
                 )
-                img_data_2 = self.camera_model.capture_image()
+                img_data_2 = self.capture_settled(timeline, "side 2")
                 self.mixing_data_side_2_1 = img_data_2
 
                 self.serial_model.send_and_wait_ok(
@@ -229,7 +611,7 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0 0\n"
                 )
-                img_data_3 = self.camera_model.capture_image()
+                img_data_3 = self.capture_settled(timeline, "side 3")
                 self.mixing_data_side_3_1 = img_data_3
 
                 self.serial_model.send_and_wait_ok(
@@ -239,72 +621,81 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0\n"
                 )
-                img_data_4 = self.camera_model.capture_image()
+                img_data_4 = self.capture_settled(timeline, "side 4")
                 self.mixing_data_side_4_1 = img_data_4
 
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0\n"
                 )
 
-                self.camera_model.close()
-
+                completed = True
                 self.main_view.setEnabled(True)
             except Exception as e:
                 self.main_view.show_error(str(e))
                 self.main_view.setEnabled(True)
+                # Nothing was captured to analyze
+                return
+            finally:
+                self.finish_timeline(timeline, completed)
         if self.main_view.local_radio.isChecked():
             img_path = self.main_view.open_file_dialog()
             img_data = cv2.imread(img_path)
             if img_data is None:
                 self.main_view.show_warning("No image file selected.")
                 return
+            side_views = [
+                (name, cv2.imread(path)) for name, path in side_view_paths(img_path)
+            ]
+            roi = None
+        else:
+            side_views = [
+                ("side_1", self.mixing_data_side_1_1),
+                ("side_2", self.mixing_data_side_2_1),
+                ("side_3", self.mixing_data_side_3_1),
+                ("side_4", self.mixing_data_side_4_1),
+            ]
 
         try:
-            chewing_gum_mask = hsv_segmentation(img_data, 54, 255)
-            img_data = cv2.bitwise_and(img_data, img_data, mask=chewing_gum_mask)
-            hsv_data = cv2.cvtColor(img_data, cv2.COLOR_BGR2HSV)
-            h_channel, s_channel, v_channel = cv2.split(hsv_data)
-            fig_hist = get_hsv_histogram_figure(
-                h_channel, s_channel, v_channel, chewing_gum_mask
+            self.analyze_mixing_views(
+                img_data, side_views, roi=roi, store=not self.main_view.local_radio.isChecked()
             )
-            voh, sdhue = compute_hue(h_channel[chewing_gum_mask > 0])
-
-            self.main_view.visualize_image(img_data, self.main_view.mixing_capture_pb)
-            self.main_view.visualize_image(hsv_data, self.main_view.mixing_hsv_pb)
-            self.main_view.visualize_figure(
-                fig_hist, self.main_view.mixing_histogram_pb
-            )
-
-            self.main_view.voh_box.setText(f"{voh:.4f}")
-            self.main_view.sdh_box.setText(f"{sdhue:.4f}")
-
-        except Exception as e:
-            self.main_view.show_error(str(e))
+        except DishOutsideRoi as e:
+            self.drop_dish_roi("mixing", e)
+            self.start_mixing_analysis()
 
     def start_mixing_analysis_2(self):
+        import cv2
+        from controller.src.mixing.multi_view import side_view_paths
+        from controller.src.calibration import DishOutsideRoi
+
         self.main_view.append_log("Starting mixing analysis...")
+        roi = None
 
         if self.main_view.online_radio.isChecked():
+            if self.serial_model is None:
+                self.main_view.show_warning("Please connect to serial port first.")
+                return
+            # The sequence needs the camera in trigger mode
+            self.stop_live_preview()
+            self.stop_recording()
+            self.main_view.setEnabled(False)
+            timeline = self.start_timeline()
+            completed = False
             try:
-                if self.serial_model is None:
-                    self.main_view.show_warning("Please connect to serial port first.")
-                    return
-                self.main_view.setEnabled(False)
-
                 # Move motor to position to capture image
                 self.serial_model.send_and_wait_ok("motor 140\n")
-                time.sleep(self.delay_time)
 
                 # Turn on the led region 1 for mixing analysis
-                self.camera_model = CameraModel(**self.camera_config)
+                self.camera_model = self.open_camera()
+                self.camera_model.use_profile("main")
+                roi = self.capture_rois["mixing_2"] = self.use_dish_roi("mixing")
 
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 1 0 0 0 1 0 0 0 1 0 0 0 0\n"
                 )
-                time.sleep(self.delay_time)
                 # //////////////////////////////////
                 # PUT CODE TO CAPTURE THE IMAGE 1 HERE
-                img_data = self.camera_model.capture_image()
+                img_data = self.capture_settled(timeline, "main")
                 # # /////////////////////////////////
                 if img_data is None:
                     self.main_view.show_error("Failed to capture image from camera.")
@@ -316,17 +707,14 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 1 0 0 0 1 0 0 0 1 0 0 0 0\n"
                 )
-                time.sleep(self.delay_time)
 
-                # Release camera resources
-                self.camera_model.close()
-
-                self.camera_config["exposure_time"] = 15000
+                # Side-lit shots need the longer exposure; switched without reopening the camera
+                self.camera_model.use_profile("side")
 
                 self.serial_model.send_and_wait_ok(
                     "led 1 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0\n"
                 )
-                img_data_1 = self.camera_model.capture_image()
+                img_data_1 = self.capture_settled(timeline, "side 1")
                 self.mixing_data_side_1_2 = img_data_1
 
                 self.serial_model.send_and_wait_ok(
@@ -336,7 +724,7 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0\n"
                 )
-                img_data_2 = self.camera_model.capture_image()
+                img_data_2 = self.capture_settled(timeline, "side 2")
                 self.mixing_data_side_2_2 = img_data_2
 
                 self.serial_model.send_and_wait_ok(
@@ -346,7 +734,7 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0 0\n"
                 )
-                img_data_3 = self.camera_model.capture_image()
+                img_data_3 = self.capture_settled(timeline, "side 3")
                 self.mixing_data_side_3_2 = img_data_3
 
                 self.serial_model.send_and_wait_ok(
@@ -356,35 +744,130 @@ class MainController:
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0\n"
                 )
-                img_data_4 = self.camera_model.capture_image()
+                img_data_4 = self.capture_settled(timeline, "side 4")
                 self.mixing_data_side_4_2 = img_data_4
 
                 self.serial_model.send_and_wait_ok(
                     "led 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0\n"
                 )
 
-                self.camera_model.close()
-
+                completed = True
                 self.main_view.setEnabled(True)
             except Exception as e:
                 self.main_view.show_error(str(e))
                 self.main_view.setEnabled(True)
+                # Nothing was captured to analyze
+                return
+            finally:
+                self.finish_timeline(timeline, completed)
         if self.main_view.local_radio.isChecked():
             img_path = self.main_view.open_file_dialog()
             img_data = cv2.imread(img_path)
             if img_data is None:
                 self.main_view.show_warning("No image file selected.")
                 return
+            side_views = [
+                (name, cv2.imread(path)) for name, path in side_view_paths(img_path)
+            ]
+            roi = None
+        else:
+            side_views = [
+                ("side_1", self.mixing_data_side_1_2),
+                ("side_2", self.mixing_data_side_2_2),
+                ("side_3", self.mixing_data_side_3_2),
+                ("side_4", self.mixing_data_side_4_2),
+            ]
+
+        try:
+            self.analyze_mixing_views(
+                img_data, side_views, roi=roi, store=not self.main_view.local_radio.isChecked()
+            )
+        except DishOutsideRoi as e:
+            self.drop_dish_roi("mixing", e)
+            self.start_mixing_analysis_2()
+
+    def analyze_mixing_views(self, img_data, side_views, roi=None, store=True):
+        """
+        Analyze the main view here and the side views in the pool; `roi` is the sensor ROI they were captured with.
+        A re-detected dish is stored in the calibration only with `store` (live captures).
+        """
+        from controller.src.mixing.hsv_segmentation import hsv_segmentation
+        from controller.src.mixing.histogram import get_hsv_histogram_figure
+        from controller.src.mixing.frame_context import FrameContext
+        from controller.src.mixing.mixing_metrics import compute_mixing_metrics
+        from controller.src.mixing.multi_view import (
+            SCALAR_METRICS,
+            aggregate_view_metrics,
+            collect_views,
+            format_view_summary,
+            submit_views,
+        )
+        from controller.src.calibration import DishOutsideRoi
+        from controller.src.dish_detection import DISH_PROFILES
+        from model.raw_frame import as_bgr
 
+        start = time.perf_counter()
         try:
-            chewing_gum_mask = hsv_segmentation(img_data, 54, 255)
-            img_data = cv2.bitwise_and(img_data, img_data, mask=chewing_gum_mask)
-            hsv_data = cv2.cvtColor(img_data, cv2.COLOR_BGR2HSV)
-            h_channel, s_channel, v_channel = cv2.split(hsv_data)
+            # Raw Bayer captures are demosaiced only now; side views in their workers
+            img_data = as_bgr(img_data)
+            # Color planes are converted once per frame and shared by all metrics
+            frame = FrameContext(img_data)
+
+            circle = self.calibration.resolve(img_data, "mixing", roi=roi, store=store)
+            params = {"hsv_lower": 54, "hsv_upper": 255, "hough": DISH_PROFILES["mixing"], "circle": circle}
+
+            # Side-lit views not in the cache run in worker processes while the main view is analyzed here
+            side_keys = {
+                name: self.result_cache.key(img, "mixing_view", **params)
+                for name, img in side_views if img is not None
+            }
+            side_cached = {name: self.result_cache.get(key) for name, key in side_keys.items()}
+            side_futures = submit_views(
+                [(name, img) for name, img in side_views if side_cached.get(name) is None], circle
+            )
+
+            key = self.result_cache.key(img_data, "mixing", **params)
+            cached = self.result_cache.get(key)
+            if cached is None:
+                chewing_gum_mask = hsv_segmentation(
+                    img_data, 54, 255, circle=circle, tiles=self.segmentation_tiles, frame=frame
+                )
+                frame.gum_mask = chewing_gum_mask
+
+                metrics = compute_mixing_metrics(frame)
+                hist_h, hist_s, hist_v = metrics["hsv_histograms"]
+                self.result_cache.put(key, {
+                    "gum_mask": chewing_gum_mask,
+                    "metrics": {name: metrics[name] for name in SCALAR_METRICS},
+                    "hsv_histograms": {"h": hist_h, "s": hist_s, "v": hist_v},
+                })
+            else:
+                self.main_view.append_log("Mixing result loaded from cache.")
+                chewing_gum_mask = cached["gum_mask"]
+                frame.gum_mask = chewing_gum_mask
+
+                metrics = cached["metrics"]
+                hist = cached["hsv_histograms"]
+                metrics["hsv_histograms"] = hist["h"], hist["s"], hist["v"]
+            voh, sdhue = metrics["voh"], metrics["sdhue"]
+
+            img_data = frame.masked("bgr")
+            hsv_data = frame.masked("hsv")
+            h_channel, s_channel, v_channel = frame.channels("hsv")
             fig_hist = get_hsv_histogram_figure(
-                h_channel, s_channel, v_channel, chewing_gum_mask
+                h_channel, s_channel, v_channel, chewing_gum_mask,
+                histograms=metrics["hsv_histograms"],
+            )
+
+            self.main_view.append_log(
+                f"CV_ab: {metrics['cv_ab']:.4f}, local var a*b*: {metrics['local_var_ab']:.2f}, UAF green/red/total: "
+                f"{metrics['uaf_green']:.4f}/{metrics['uaf_red']:.4f}/{metrics['uaf_total']:.4f}"
+            )
+            conversions = frame.conversion_stats()
+            print(
+                f"[DEBUG] Color conversions: {conversions['conversions_performed']} performed, "
+                f"{conversions['conversions_avoided']} avoided."
             )
-            voh, sdhue = compute_hue(h_channel[chewing_gum_mask > 0])
 
             self.main_view.visualize_image(img_data, self.main_view.mixing_capture_pb)
             self.main_view.visualize_image(hsv_data, self.main_view.mixing_hsv_pb)
@@ -395,10 +878,31 @@ class MainController:
             self.main_view.voh_box.setText(f"{voh:.4f}")
             self.main_view.sdh_box.setText(f"{sdhue:.4f}")
 
+            per_view = {"main": {key: float(metrics[key]) for key in SCALAR_METRICS}}
+            per_view["main"]["seconds"] = time.perf_counter() - start
+            for name, side_metrics in collect_views(side_futures).items():
+                if "error" not in side_metrics:
+                    self.result_cache.put(side_keys[name], side_metrics)
+                per_view[name] = side_metrics
+            per_view.update({name: m for name, m in side_cached.items() if m is not None})
+            result = {
+                "per_view": per_view,
+                "aggregate": aggregate_view_metrics(per_view),
+                "seconds": time.perf_counter() - start,
+            }
+            self.mixing_view_metrics = result
+            for line in format_view_summary(result):
+                self.main_view.append_log(line)
+
+        except DishOutsideRoi:
+            # The caller recaptures at full sensor
+            raise
         except Exception as e:
             self.main_view.show_error(str(e))
-        
+
     def save_comminution_data(self):
+        import cv2
+
         try:
             name = self.main_view.get_name()
             gender = self.main_view.get_gender()
@@ -406,7 +910,7 @@ class MainController:
 
             saved_path = "saved_data"
 
-            os.makedirs(self.save_data, exist_ok=True)
+            os.makedirs(saved_path, exist_ok=True)
             
             comminution_path = os.path.join(saved_path, "comminution")
             os.makedirs(comminution_path, exist_ok=True)
@@ -417,7 +921,11 @@ class MainController:
                 comminution_save_dir = os.path.join(comminution_path, f"{name}_{gender}_{age}")
                 os.makedirs(comminution_save_dir, exist_ok=True)
                 comminution_save_path = os.path.join(comminution_save_dir, f"{chewing_cycles}.png")
-                cv2.imwrite(comminution_save_path, self.comminution_data)
+                cv2.imwrite(comminution_save_path, self.full_frame(self.comminution_data, "comminution"))
+
+                if self.comminution_size_summary is not None:
+                    summary_save_path = os.path.join(comminution_save_dir, f"{chewing_cycles}_sizes.json")
+                    self.comminution_size_summary.save(summary_save_path)
             else:
                 self.main_view.show_warning("No comminution data to save.")
 
@@ -425,6 +933,8 @@ class MainController:
             self.main_view.show_error(str(e))
 
     def save_mixing_data_side_1(self):
+        import cv2
+
         try:
             name = self.main_view.get_name()
             gender = self.main_view.get_gender()
@@ -432,7 +942,7 @@ class MainController:
 
             saved_path = "saved_data"
 
-            os.makedirs(self.save_data, exist_ok=True)
+            os.makedirs(saved_path, exist_ok=True)
 
             mixing_path = os.path.join(saved_path, "mixing")
             os.makedirs(mixing_path, exist_ok=True)
@@ -442,31 +952,31 @@ class MainController:
             os.makedirs(mixing_save_dir, exist_ok=True)
             if self.mixing_data_main_side_1 is not None:
                 mixing_save_path_side_1 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_1}_1.png")
-                cv2.imwrite(mixing_save_path_side_1, self.mixing_data_main_side_1)
+                cv2.imwrite(mixing_save_path_side_1, self.full_frame(self.mixing_data_main_side_1, "mixing"))
             else:
                 self.main_view.show_warning("No mixing data main side 1 to save.")
 
             if self.mixing_data_main_side_1 is  not None:
                 mixing_save_path_side_1_1 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_1}_1_1.png")
-                cv2.imwrite(mixing_save_path_side_1_1, self.mixing_data_side_1_1)
+                cv2.imwrite(mixing_save_path_side_1_1, self.full_frame(self.mixing_data_side_1_1, "mixing"))
             else:
                 self.main_view.show_warning("No mixing data side 1 to save.")
 
             if self.mixing_data_side_2_1 is not None:
                 mixing_save_path_side_2_1 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_1}_2_1.png")
-                cv2.imwrite(mixing_save_path_side_2_1, self.mixing_data_side_2_1)
+                cv2.imwrite(mixing_save_path_side_2_1, self.full_frame(self.mixing_data_side_2_1, "mixing"))
             else:
                 self.main_view.show_warning("No mixing data side 2 to save.")
 
             if self.mixing_data_side_3_1 is not None:
                 mixing_save_path_side_3_1 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_1}_3_1.png")
-                cv2.imwrite(mixing_save_path_side_3_1, self.mixing_data_side_3_1)
+                cv2.imwrite(mixing_save_path_side_3_1, self.full_frame(self.mixing_data_side_3_1, "mixing"))
             else:                
                 self.main_view.show_warning("No mixing data side 3 to save.")
                 
             if self.mixing_data_side_4_1 is not None:
                 mixing_save_path_side_4_1 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_1}_4_1.png")
-                cv2.imwrite(mixing_save_path_side_4_1, self.mixing_data_side_4_1)
+                cv2.imwrite(mixing_save_path_side_4_1, self.full_frame(self.mixing_data_side_4_1, "mixing"))
             else:
                 self.main_view.show_warning("No mixing data side 4 to save.")
 
@@ -474,6 +984,8 @@ class MainController:
             self.main_view.show_error(str(e))
 
     def save_mixing_data_side_2(self):
+        import cv2
+
         try:
             name = self.main_view.get_name()
             gender = self.main_view.get_gender()
@@ -481,7 +993,7 @@ class MainController:
 
             saved_path = "saved_data"
 
-            os.makedirs(self.save_data, exist_ok=True)
+            os.makedirs(saved_path, exist_ok=True)
 
             mixing_path = os.path.join(saved_path, "mixing")
             os.makedirs(mixing_path, exist_ok=True)
@@ -491,27 +1003,27 @@ class MainController:
             os.makedirs(mixing_save_dir, exist_ok=True)
             if self.mixing_data_main_side_2 is not None:
                 mixing_save_path_side_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_2.png")
-                cv2.imwrite(mixing_save_path_side_2, self.mixing_data_main_side_2)
+                cv2.imwrite(mixing_save_path_side_2, self.full_frame(self.mixing_data_main_side_2, "mixing_2"))
             else:
                 self.main_view.show_warning("No mixing data main side 2 to save.")
             if self.mixing_data_side_1_2 is not None:
-                mixing_save_path_side_1_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_2_1.png")
-                cv2.imwrite(mixing_save_path_side_1_2, self.mixing_data_side_1_2)
+                mixing_save_path_side_1_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_1_2.png")
+                cv2.imwrite(mixing_save_path_side_1_2, self.full_frame(self.mixing_data_side_1_2, "mixing_2"))
             else:
                 self.main_view.show_warning("No mixing data side 1 to save.")
             if self.mixing_data_side_2_2 is not None:
                 mixing_save_path_side_2_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_2_2.png")
-                cv2.imwrite(mixing_save_path_side_2_2, self.mixing_data_side_2_2)
+                cv2.imwrite(mixing_save_path_side_2_2, self.full_frame(self.mixing_data_side_2_2, "mixing_2"))
             else:
                 self.main_view.show_warning("No mixing data side 2 to save.")
             if self.mixing_data_side_3_2 is not None:
                 mixing_save_path_side_3_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_3_2.png")
-                cv2.imwrite(mixing_save_path_side_3_2, self.mixing_data_side_3_2)
+                cv2.imwrite(mixing_save_path_side_3_2, self.full_frame(self.mixing_data_side_3_2, "mixing_2"))
             else:
                 self.main_view.show_warning("No mixing data side 3 to save.")
             if self.mixing_data_side_4_2 is not None:
-                mixing_save_path_side_4_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_2_4.png")
-                cv2.imwrite(mixing_save_path_side_4_2, self.mixing_data_side_4_2)
+                mixing_save_path_side_4_2 = os.path.join(mixing_save_dir, f"{mixing_chewing_cycles_side_2}_4_2.png")
+                cv2.imwrite(mixing_save_path_side_4_2, self.full_frame(self.mixing_data_side_4_2, "mixing_2"))
             else:
                 self.main_view.show_warning("No mixing data side 4 to save.")
 
@@ -548,7 +1060,12 @@ class MainController:
         baud = self.main_view.get_baudrate()
 
         try:
-            self.serial_model = SerialModel(port, baud)
+            from model.backends import create_serial
+
+            backend = self.backends["serial"]
+            self.serial_model = create_serial(
+                backend, port, baud, ack_timeout=self.ack_timeout, **self._backend_options(backend)
+            )
             self.main_view.append_log(f"Connected to {port} at {baud} baud.")
             self.main_view.show_info(
                 f"Connected successfully to {port} at {baud} baud."
@@ -0,0 +1,112 @@
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from model.raw_frame import RawFrame
+
+
+class AcquisitionTimeline:
+    """
+    Record of where the time of one acquisition sequence goes.
+
+    Steps are named "<kind> <detail>" (e.g. "serial motor 140", "settle main");
+    summary() totals them per kind.
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.steps = []
+
+    def record(self, name, start, end, **info):
+        self.steps.append({"name": name, "start": start - self.t0, "seconds": end - start, **info})
+
+    @contextmanager
+    def step(self, name, **info):
+        # The yielded dict can be filled with details (frames, stable, ...) inside the block
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(name, start, time.perf_counter(), **info)
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.t0
+
+    def totals(self):
+        per_kind = {}
+        for step in self.steps:
+            kind = step["name"].split(" ", 1)[0]
+            per_kind[kind] = per_kind.get(kind, 0.0) + step["seconds"]
+        return per_kind
+
+    def summary(self):
+        parts = ", ".join(f"{kind} {seconds:.2f} s" for kind, seconds in self.totals().items())
+        return f"Acquisition took {self.total:.2f} s ({parts})"
+
+    def print_steps(self):
+        for step in self.steps:
+            details = "".join(f", {k}={v}" for k, v in step.items() if k not in ("name", "start", "seconds"))
+            print(f"[DEBUG] {step['start']:7.3f} s  {step['name']}: {step['seconds']:.3f} s{details}")
+
+
+def preview(img, scale=8):
+    """Downscaled grayscale copy used for the settle checks."""
+    if isinstance(img, RawFrame):
+        # Straight from the mosaic; settle frames are never demosaiced
+        return img.gray_preview(scale).astype(np.float32)
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(
+        gray, (gray.shape[1] // scale, gray.shape[0] // scale), interpolation=cv2.INTER_AREA
+    ).astype(np.float32)
+
+
+def wait_for_stable_frame(
+    grab,
+    timeout=3.0,
+    brightness_tolerance=1.0,
+    motion_tolerance=2.0,
+    consecutive=1,
+    scale=8,
+):
+    """
+    Grab frames until the scene stops changing and return the last one.
+
+    A pair of consecutive frames counts as stable when their mean brightness
+    differs by less than brightness_tolerance (LED switched and steady) and
+    their mean absolute difference is below motion_tolerance (dish at rest).
+    `consecutive` stable pairs in a row end the wait; the final frame is the
+    capture, so settled scenes cost two grabs instead of a fixed delay.
+
+    Returns (frame, stable, frames_grabbed). On timeout the last frame is
+    returned with stable=False.
+    """
+    start = time.perf_counter()
+    frame = grab()
+    if frame is None:
+        return None, False, 1
+
+    previous = preview(frame, scale)
+    frames, stable_pairs = 1, 0
+
+    while time.perf_counter() - start < timeout:
+        frame = grab()
+        frames += 1
+        if frame is None:
+            return None, False, frames
+
+        current = preview(frame, scale)
+        brightness_change = abs(float(current.mean()) - float(previous.mean()))
+        motion = float(cv2.absdiff(current, previous).mean())
+        previous = current
+
+        if brightness_change < brightness_tolerance and motion < motion_tolerance:
+            stable_pairs += 1
+            if stable_pairs >= consecutive:
+                return frame, True, frames
+        else:
+            stable_pairs = 0
+
+    return frame, False, frames
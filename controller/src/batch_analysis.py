@@ -0,0 +1,391 @@
+import csv
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from controller.src.comminution.density_analysis import particle_size_distribution
+from controller.src.comminution.segment_particle import segment_particles
+from controller.src.calibration import DishCalibration
+from controller.src.dish_detection import DISH_PROFILES
+from controller.src.mixing.frame_context import FrameContext
+from controller.src.mixing.hsv_segmentation import hsv_segmentation
+from controller.src.mixing.mixing_metrics import compute_mixing_metrics
+from controller.src.mixing.multi_view import SCALAR_METRICS, analyze_view, parse_side_view
+from controller.src.result_cache import ResultCache
+from controller.src.tiling import default_workers
+
+# Column order of the result file; metrics that do not apply to a row stay empty
+COLUMNS = (
+    "path", "kind", "subject", "cycles", "side", "view", "status", "error", "seconds",
+    "particles", "pixel_size_mm", "D10", "D50", "D90",
+    *SCALAR_METRICS, "gum_pixels",
+)
+
+KINDS = ("comminution", "mixing")
+
+# Extra seconds a task may run past its budget before run_batch stops its worker
+HARD_BUDGET_GRACE_S = 5.0
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def discover_images(root="saved_data", kinds=KINDS):
+    """
+    Tasks for every image written by the save_* methods of MainController.
+
+    comminution/<subject>/<cycles>.png, and mixing/<subject>/<cycles>_<side>.png
+    (main view) or the side-lit view names in multi_view.SIDE_VIEW_SUFFIXES.
+    """
+    tasks = []
+    for kind in kinds:
+        kind_root = os.path.join(root, kind)
+        if not os.path.isdir(kind_root):
+            continue
+
+        for subject in sorted(os.listdir(kind_root)):
+            subject_dir = os.path.join(kind_root, subject)
+            if not os.path.isdir(subject_dir):
+                continue
+
+            for filename in sorted(os.listdir(subject_dir)):
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() != ".png":
+                    continue
+
+                parts = stem.split("_")
+                task = {"path": os.path.join(subject_dir, filename), "kind": kind, "subject": subject}
+                if kind == "comminution" and len(parts) == 1:
+                    task.update(cycles=parts[0], side="", view="main")
+                elif kind == "mixing" and len(parts) == 2:
+                    task.update(cycles=parts[0], side=parts[1], view="main")
+                elif kind == "mixing" and len(parts) == 3 and parse_side_view(task["path"]):
+                    side, view = parse_side_view(task["path"])
+                    task.update(cycles=parts[0], side=side, view=view)
+                else:
+                    continue
+                tasks.append(task)
+
+    return tasks
+
+
+@contextmanager
+def time_budget(seconds):
+    """
+    Interrupt the enclosed block with BudgetExceeded after `seconds`.
+
+    Uses SIGALRM where it exists (pool workers run tasks on their main thread);
+    elsewhere (Windows) the stage checkpoints in analyze_image apply, and
+    run_batch stops a worker that is still busy after the budget plus
+    HARD_BUDGET_GRACE_S.
+    """
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise BudgetExceeded(f"over the {seconds:g} s budget")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _check_budget(start, budget):
+    if budget and time.perf_counter() - start > budget:
+        raise BudgetExceeded(f"over the {budget:g} s budget")
+
+
+# The cache entries below use the same stages, parameters and contents as
+# MainController, and the dish circle and pixel size come from its
+# DishCalibration (read-only, like images loaded from disk in the GUI), so
+# the GUI and batch runs reuse each other's results.
+
+def _analyze_comminution(img, start, budget, fallback_pixel_size_mm, cache, calibration):
+    circle = calibration.resolve(img, "comminution", store=False)
+    pixel_size_mm = calibration.pixel_size_mm("comminution", default=fallback_pixel_size_mm)
+    _check_budget(start, budget)
+
+    key = cache.key(
+        img,
+        "comminution",
+        thresh_s=54,
+        hough=DISH_PROFILES["comminution"],
+        circle=circle,
+        pixel_size_mm=pixel_size_mm,
+    ) if cache else None
+    cached = cache.get(key) if cache else None
+    if cached is None:
+        segment_img, _, mask_s, _, particles = segment_particles(img, pixel_size_mm=pixel_size_mm, circle=circle)
+        _check_budget(start, budget)
+
+        distribution = particle_size_distribution(particles, log_scale=None)
+        if cache:
+            cache.put(key, {
+                "segment_img": segment_img,
+                "mask_s": mask_s,
+                "particles": particles,
+                "distribution": distribution,
+            })
+    else:
+        particles, distribution = cached["particles"], cached["distribution"]
+
+    return {
+        "particles": len(particles["label"]),
+        "pixel_size_mm": pixel_size_mm,
+        "D10": distribution["D10"],
+        "D50": distribution["D50"],
+        "D90": distribution["D90"],
+    }
+
+
+def _main_view_path(task):
+    folder = os.path.dirname(task["path"])
+    return os.path.join(folder, f"{task['cycles']}_{task['side']}.png")
+
+
+def _analyze_mixing(img, task, cache, calibration):
+    view = task["view"]
+    # The GUI resolves the dish on the main view and shares it with the side views
+    main_img = img if view == "main" else cv2.imread(_main_view_path(task))
+    circle = calibration.resolve(img if main_img is None else main_img, "mixing", store=False)
+    params = {"hsv_lower": 54, "hsv_upper": 255, "hough": DISH_PROFILES["mixing"], "circle": circle}
+
+    if view != "main":
+        # Side-lit views are cached as analyze_view results
+        key = cache.key(img, "mixing_view", **params) if cache else None
+        metrics = cache.get(key) if cache else None
+        if metrics is None:
+            metrics = analyze_view(img, circle)
+            if cache:
+                cache.put(key, metrics)
+        return {key: metrics[key] for key in (*SCALAR_METRICS, "gum_pixels")}
+
+    # Main views are cached with the gum mask and HSV histograms the GUI displays
+    key = cache.key(img, "mixing", **params) if cache else None
+    cached = cache.get(key) if cache else None
+    if cached is None:
+        frame = FrameContext(img)
+        frame.gum_mask = hsv_segmentation(img, 54, 255, circle=circle, frame=frame)
+        metrics = compute_mixing_metrics(frame)
+        gum_mask = frame.gum_mask
+        if cache:
+            hist_h, hist_s, hist_v = metrics["hsv_histograms"]
+            cache.put(key, {
+                "gum_mask": gum_mask,
+                "metrics": {name: metrics[name] for name in SCALAR_METRICS},
+                "hsv_histograms": {"h": hist_h, "s": hist_s, "v": hist_v},
+            })
+    else:
+        metrics, gum_mask = cached["metrics"], cached["gum_mask"]
+
+    row = {name: metrics[name] for name in SCALAR_METRICS}
+    row["gum_pixels"] = int(np.count_nonzero(gum_mask))
+    return row
+
+
+def analyze_image(task, budget=None, radius_mm=70, fallback_pixel_size_mm=None, cache_dir=None,
+                  cache_max_bytes=2 * 1024**3, calibration_path="configs/calibration.yaml"):
+    """
+    Analyze one discovered image and return its result row; never raises.
+
+    With cache_dir, results go through the ResultCache there (the GUI's cache.path).
+    The dish is resolved through the calibration at calibration_path, never updated.
+    """
+    start = time.perf_counter()
+    row = dict(task, status="ok", error="")
+    cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+    calibration = DishCalibration(calibration_path, radius_mm=radius_mm)
+
+    try:
+        with time_budget(budget):
+            img = cv2.imread(task["path"])
+            if img is None:
+                raise RuntimeError("Could not read image")
+
+            if task["kind"] == "comminution":
+                row.update(_analyze_comminution(img, start, budget, fallback_pixel_size_mm, cache, calibration))
+            else:
+                row.update(_analyze_mixing(img, task, cache, calibration))
+    except BudgetExceeded as e:
+        row.update(status="timeout", error=str(e))
+    except Exception as e:
+        row.update(status="error", error=str(e))
+
+    row["seconds"] = time.perf_counter() - start
+    return row
+
+
+def _init_worker():
+    # One OpenCV thread per worker; the pool itself provides the parallelism
+    cv2.setNumThreads(1)
+
+
+def _new_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def _stop_pool(pool):
+    """Stop the workers of a pool, including any still running a task."""
+    # A running task cannot be cancelled, only its process terminated
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def read_journal(path):
+    """Rows already written to a result CSV, keyed by image path (last row wins)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return {row["path"]: row for row in csv.DictReader(f)}
+
+
+def _require_pandas():
+    try:
+        import pandas as pd
+    except ImportError:
+        raise RuntimeError("Parquet output needs pandas and pyarrow; use a .csv output instead.")
+    return pd
+
+
+def write_parquet(journal_path, output_path):
+    pd = _require_pandas()
+    table = pd.read_csv(journal_path).drop_duplicates("path", keep="last")
+    table.to_parquet(output_path, index=False)
+
+
+def run_batch(
+    root="saved_data",
+    output="batch_results.csv",
+    kinds=KINDS,
+    workers=None,
+    budget=120.0,
+    retry_failed=False,
+    radius_mm=70,
+    fallback_pixel_size_mm=None,
+    progress_every=10,
+    cache_dir=None,
+    cache_max_bytes=2 * 1024**3,
+    calibration_path="configs/calibration.yaml",
+):
+    """
+    Analyze every saved image on a process pool, streaming rows to `output`.
+
+    Rows go to a CSV journal as they finish (the output itself, or
+    <output>.csv for .parquet outputs, converted at the end). Images already in
+    the journal are skipped, so an interrupted run resumes where it stopped;
+    with retry_failed, images that errored or timed out are analyzed again.
+    With cache_dir, results are shared with the GUI through its ResultCache;
+    dish circles come from the GUI's calibration file, which is only read.
+    Returns a summary with counts, wall time and images per second.
+    """
+    parquet = output.lower().endswith(".parquet")
+    journal_path = output + ".csv" if parquet else output
+    if parquet:
+        # Fail before hours of analysis rather than at the final conversion
+        _require_pandas()
+
+    done = read_journal(journal_path)
+    if retry_failed:
+        done = {path: row for path, row in done.items() if row["status"] == "ok"}
+
+    tasks = [task for task in discover_images(root, kinds) if task["path"] not in done]
+    print(f"[DEBUG] {len(tasks)} images to analyze, {len(done)} already in {journal_path}")
+
+    summary = {"images": len(tasks), "ok": 0, "timeout": 0, "error": 0}
+    seconds_by_kind = {}
+    start = time.perf_counter()
+    workers = workers or default_workers()
+    args = (budget, radius_mm, fallback_pixel_size_mm, cache_dir, cache_max_bytes, calibration_path)
+
+    new_file = not os.path.exists(journal_path)
+    with open(journal_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        if new_file:
+            writer.writeheader()
+
+        def record(row):
+            writer.writerow(row)
+            f.flush()
+
+            summary[row["status"]] += 1
+            seconds_by_kind.setdefault(row["kind"], []).append(row["seconds"])
+            if row["status"] != "ok":
+                print(f"[DEBUG] {row['path']}: {row['status']} ({row['error']})")
+
+            finished = sum(summary[status] for status in ("ok", "timeout", "error"))
+            if finished % progress_every == 0 or finished == len(tasks):
+                elapsed = time.perf_counter() - start
+                print(
+                    f"[DEBUG] {finished}/{len(tasks)} images, "
+                    f"{finished / elapsed:.2f} images/s, {elapsed:.1f} s elapsed"
+                )
+
+        # At most one task per worker is submitted, so a task starts when it is
+        # submitted and its deadline can be enforced from here on any platform
+        queue = deque(tasks)
+        running = {}
+        pool = _new_pool(workers)
+        try:
+            while queue or running:
+                while queue and len(running) < workers:
+                    task = queue.popleft()
+                    deadline = time.perf_counter() + budget + HARD_BUDGET_GRACE_S if budget else None
+                    running[pool.submit(analyze_image, task, *args)] = (task, deadline)
+
+                deadlines = [deadline for _, deadline in running.values() if deadline is not None]
+                timeout = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                broken = False
+                for future in done:
+                    task, _ = running.pop(future)
+                    try:
+                        record(future.result())
+                    except BrokenProcessPool as e:
+                        broken = True
+                        record(dict(task, status="error", error=f"worker died: {e}", seconds=0.0))
+
+                now = time.perf_counter()
+                overdue = [
+                    future for future, (_, deadline) in running.items()
+                    if deadline is not None and now >= deadline
+                ]
+                for future in overdue:
+                    task, _ = running.pop(future)
+                    record(dict(
+                        task, status="timeout", seconds=budget + HARD_BUDGET_GRACE_S,
+                        error=f"over the {budget:g} s budget, worker stopped",
+                    ))
+
+                if overdue or broken:
+                    # Tasks running next to the stopped one start again on a fresh pool
+                    queue.extendleft(reversed([task for task, _ in running.values()]))
+                    running.clear()
+                    _stop_pool(pool)
+                    pool = _new_pool(workers)
+        finally:
+            _stop_pool(pool)
+
+    if parquet:
+        write_parquet(journal_path, output)
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["images_per_second"] = summary["images"] / summary["seconds"] if summary["images"] else 0.0
+    summary["mean_seconds"] = {
+        kind: sum(values) / len(values) for kind, values in seconds_by_kind.items()
+    }
+    return summary
@@ -0,0 +1,127 @@
+import os
+import time
+
+import yaml
+
+from controller.src.dish_detection import DISH_PROFILES, check_dish_ring, detect_profile_circle
+from model.camera_roi import circle_to_roi, circle_to_sensor
+
+
+class DishOutsideRoi(RuntimeError):
+    """The dish, re-detected in a sensor ROI frame, no longer fits inside that ROI."""
+
+
+class DishCalibration:
+    """
+    Per-rig cache of dish geometry, persisted to a YAML calibration file.
+
+    Each motor position stores center, radius and pixel_size_mm. resolve()
+    returns the cached circle as long as a cheap edge-ring check confirms it
+    still fits the frame, and only re-runs the Hough detection when it fails.
+    """
+
+    def __init__(self, path="configs/calibration.yaml", radius_mm=70):
+        self.path = path
+        self.radius_mm = radius_mm
+        self.entries = {}
+        self.load()
+
+    @staticmethod
+    def _key(position):
+        return f"{position}@motor{DISH_PROFILES[position]['motor']}"
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.entries = yaml.safe_load(f) or {}
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(self.entries, f, sort_keys=True)
+
+    def get(self, position):
+        return self.entries.get(self._key(position))
+
+    def circle(self, position):
+        entry = self.get(position)
+        if entry is None:
+            return None
+        return entry["center_x"], entry["center_y"], entry["radius_px"]
+
+    def pixel_size_mm(self, position, default=None):
+        entry = self.get(position)
+        if entry is None:
+            return default
+        return entry["pixel_size_mm"]
+
+    def store(self, position, circle, frame_shape):
+        x, y, r = (float(v) for v in circle)
+        self.entries[self._key(position)] = {
+            "center_x": x,
+            "center_y": y,
+            "radius_px": r,
+            "pixel_size_mm": self.radius_mm / r,
+            "frame_height": int(frame_shape[0]),
+            "frame_width": int(frame_shape[1]),
+            "calibrated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.save()
+
+    def forget(self, position):
+        """Drop the calibration of a position, so the next capture uses the full sensor."""
+        if self.entries.pop(self._key(position), None) is not None:
+            self.save()
+
+    def resolve(self, img_bgr, position, force=False, roi=None, store=True):
+        """
+        Return the dish (x, y, r) for this frame.
+
+        Uses the cached circle when the ring check passes, otherwise re-detects
+        and updates the calibration file. With store=False (images loaded from
+        disk, batch analysis) the re-detected circle is used without touching
+        the rig calibration. Returns None if detection fails.
+        For a frame captured with a sensor ROI (offset_x, offset_y, width, height)
+        the circle is returned in frame coordinates; the file always holds
+        full-sensor ones. If the dish re-detected in an ROI frame is missing or
+        cut off by the ROI, DishOutsideRoi is raised so the caller can recapture
+        at full sensor.
+        """
+        entry = self.get(position)
+        if entry is not None and not force:
+            # An ROI frame is a crop of the calibrated sensor frame
+            same_frame = roi is not None or (
+                entry.get("frame_height") == img_bgr.shape[0] and
+                entry.get("frame_width") == img_bgr.shape[1]
+            )
+            circle = circle_to_roi(self.circle(position), roi)
+            if same_frame and check_dish_ring(img_bgr, circle):
+                return circle
+            print(f"[DEBUG] Cached dish calibration for {position} no longer fits → re-detecting.")
+
+        circle = detect_profile_circle(img_bgr, position)
+        if roi is not None and not _fits_frame(circle, img_bgr.shape):
+            raise DishOutsideRoi(f"The {position} dish is no longer inside the camera ROI.")
+        if circle is None:
+            return None
+        if not store:
+            return circle
+
+        if roi is None:
+            self.store(position, circle, img_bgr.shape)
+        else:
+            sensor_shape = (entry["frame_height"], entry["frame_width"]) if entry else (roi[1] + roi[3], roi[0] + roi[2])
+            self.store(position, circle_to_sensor(circle, roi), sensor_shape)
+        x, y, r = circle_to_sensor(circle, roi)
+        print(f"[DEBUG] Dish calibrated for {position}: Center=({x:.1f}, {y:.1f}), Radius={r:.1f}")
+        return circle
+
+
+def _fits_frame(circle, shape):
+    if circle is None:
+        return False
+    x, y, r = circle
+    return x - r >= 0 and y - r >= 0 and x + r <= shape[1] and y + r <= shape[0]
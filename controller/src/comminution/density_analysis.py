@@ -1,16 +1,82 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import gaussian_kde
 
-def analyze_particle_density(density, log_scale=None):
-    area = np.asarray(density, dtype=float)
-    area = area[area > 0]             
+from controller.src.comminution.particle_measure import particle_sizes
+
+
+def _linear_binning(data, weights, x):
+    # Split each weight between its two neighbouring grid points
+    dx = x[1] - x[0]
+    pos = (data - x[0]) / dx
+    left = np.clip(np.floor(pos).astype(np.int64), 0, len(x) - 2)
+    frac = pos - left
+
+    counts = np.bincount(left, weights=weights * (1.0 - frac), minlength=len(x))
+    counts += np.bincount(left + 1, weights=weights * frac, minlength=len(x))
+    return counts
+
+
+def _fft_convolve(counts, kernel):
+    # Full linear convolution of counts (M) with a symmetric kernel (2M - 1),
+    # keeping the M central samples that line up with the grid
+    m = len(counts)
+    n = len(counts) + len(kernel) - 1
+    n_fft = 1 << (n - 1).bit_length()
+
+    full = np.fft.irfft(np.fft.rfft(counts, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)
+    return full[m - 1: 2 * m - 1]
+
+
+def weighted_kde(data, weights, grid_size=2000):
+    """
+    Weighted Gaussian KDE evaluated on an even grid over [data.min(), data.max()].
+
+    Uses the same Scott's-rule bandwidth as scipy.stats.gaussian_kde, but bins the
+    weights onto the grid and convolves with the kernel via FFT, so the cost is
+    O(n + grid_size log grid_size) instead of O(n * grid_size).
+    """
+    data = np.asarray(data, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+
+    # Scott's factor with the effective sample size of the weights
+    n_eff = 1.0 / np.sum(weights**2)
+    factor = n_eff ** (-1.0 / 5.0)
+
+    mean = np.sum(weights * data)
+    variance = np.sum(weights * (data - mean) ** 2) / (1.0 - np.sum(weights**2))
+    bandwidth = np.sqrt(variance) * factor
+
+    if not np.isfinite(bandwidth) or bandwidth <= 0:
+        raise ValueError("Need at least two distinct particle sizes for a density estimate.")
+
+    x = np.linspace(data.min(), data.max(), grid_size)
+    dx = x[1] - x[0]
+
+    counts = _linear_binning(data, weights, x)
+
+    offsets = np.arange(-(grid_size - 1), grid_size) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2.0 * np.pi))
+
+    pdf = np.clip(_fft_convolve(counts, kernel), 0.0, None)
+    return x, pdf
+
+
+def particle_size_distribution(density, log_scale=None, grid_size=2000):
+    """
+    Area-weighted particle size distribution as plain arrays.
+
+    Returns a dict with x, pdf, cdf (KDE on the grid; x is log10 of the diameter
+    when log_scale is set) and the empirical D10, D50 and D90 in mm.
+    """
+    # Accepts either a particle table from measure_particles or a plain size array
+    area = particle_sizes(density)
+    area = area[area > 0]
 
     if area.size == 0:
         raise ValueError("No positive particle areas provided.")
 
-    sizes = area.copy()               
-    weights = area.copy()              
+    sizes = area.copy()
+    weights = area.copy()
 
     idx = np.argsort(sizes)
     sizes = sizes[idx]
@@ -23,34 +89,42 @@ def analyze_particle_density(density, log_scale=None):
     D50 = np.interp(0.50, cdf_emp, sizes)
     D90 = np.interp(0.90, cdf_emp, sizes)
 
-    if log_scale:
-        x_data = np.log10(sizes)
-        xlabel = "log10(Particle diameter [mm])"
-    else:
-        x_data = sizes
-        xlabel = "Particle diameter [mm]"
-
-    weights_kde = weights / np.sum(weights)
-
-    kde = gaussian_kde(x_data, weights=weights_kde)
+    x_data = np.log10(sizes) if log_scale else sizes
 
-    x = np.linspace(x_data.min(), x_data.max(), 2000)
-    pdf = kde(x)
+    x, pdf = weighted_kde(x_data, weights, grid_size=grid_size)
 
     dx = x[1] - x[0]
     cdf_kde = np.cumsum(pdf) * dx
     cdf_kde /= cdf_kde[-1]
 
+    return {
+        "x": x,
+        "pdf": pdf,
+        "cdf": cdf_kde,
+        "D10": D10,
+        "D50": D50,
+        "D90": D90,
+        "log_scale": bool(log_scale),
+    }
+
+
+def plot_particle_density(distribution, save_path=None, dpi=300):
+    """Draw a distribution from particle_size_distribution; optionally save it to save_path."""
+    import matplotlib.pyplot as plt
+
+    log_scale = distribution["log_scale"]
+    if log_scale:
+        xlabel = "log10(Particle diameter [mm])"
+    else:
+        xlabel = "Particle diameter [mm]"
+
     fig, ax = plt.subplots(figsize=(8, 5))
 
-    ax.plot(x, pdf, label="PDF")
-    # ax.plot(x, cdf_kde, "--", label="CDF")
+    ax.plot(distribution["x"], distribution["pdf"], label="PDF")
+    # ax.plot(distribution["x"], distribution["cdf"], "--", label="CDF")
 
-    for D, color, lbl in zip(
-        [D10, D50, D90],
-        ["r", "g", "b"],
-        ["D10", "D50", "D90"]
-    ):
+    for lbl, color in zip(["D10", "D50", "D90"], ["r", "g", "b"]):
+        D = distribution[lbl]
         v = np.log10(D) if log_scale else D
         ax.axvline(v, linestyle=":", color=color, label=f"{lbl} = {D:.2f}")
 
@@ -59,8 +133,16 @@ def analyze_particle_density(density, log_scale=None):
     ax.legend()
     ax.grid(True)
 
-    plt.tight_layout()
+    fig.tight_layout()
+
+    if save_path is not None:
+        fig.savefig(save_path, dpi=dpi)
+
+    return fig
+
 
-    plt.savefig("particle_size_distribution.png", dpi=300)
+def analyze_particle_density(density, log_scale=None, save_path=None):
+    distribution = particle_size_distribution(density, log_scale=log_scale)
+    fig = plot_particle_density(distribution, save_path=save_path)
 
-    return fig, D10, D50, D90
+    return fig, distribution["D10"], distribution["D50"], distribution["D90"]
@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+
+def particle_labels(stats, min_area=2):
+    """Labels of the components kept as particles: not background and at least min_area pixels."""
+    return np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] >= min_area) + 1
+
+
+def extract_component_contours(labels, stats, label_ids):
+    """
+    Return the external contour of each component in label_ids, in full-image coordinates.
+
+    Each component is traced inside its own CC_STAT bounding box, so the cost
+    scales with the particle area rather than with the whole crop.
+    """
+    contours = []
+    for i in label_ids:
+        bx, by, bw, bh = stats[i, cv2.CC_STAT_LEFT], stats[i, cv2.CC_STAT_TOP], stats[i, cv2.CC_STAT_WIDTH], stats[i, cv2.CC_STAT_HEIGHT]
+
+        # Pad by one pixel so contours touching the box edge are traced correctly
+        component_mask = np.zeros((bh + 2, bw + 2), dtype=np.uint8)
+        component_mask[1:-1, 1:-1] = labels[by:by + bh, bx:bx + bw] == i
+
+        cnts, _ = cv2.findContours(
+            component_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE, offset=(int(bx) - 1, int(by) - 1)
+        )
+        if not cnts:
+            contours.append(np.empty((0, 1, 2), dtype=np.int32))
+            continue
+
+        contours.append(max(cnts, key=len))
+
+    return contours
+
+
+def measure_particles(labels, stats, centroids, pixel_size_mm=None, min_area=2, contours=None):
+    """
+    Build a columnar particle table from cv2.connectedComponentsWithStats output.
+
+    Every column is a NumPy array with one row per particle (background and
+    components smaller than min_area are dropped). The perimeter is
+    cv2.arcLength of the outer contour, so holes do not add to it; pass the
+    contours of particle_labels(stats, min_area) when they are already
+    traced. When pixel_size_mm is given, area_mm2, perimeter_mm and
+    eq_diameter_mm are added.
+    """
+    keep = particle_labels(stats, min_area)
+    if contours is None:
+        contours = extract_component_contours(labels, stats, keep)
+    perimeter = np.array([cv2.arcLength(c, True) if len(c) else 0.0 for c in contours], dtype=np.float64)
+
+    area = stats[keep, cv2.CC_STAT_AREA].astype(np.float64)
+
+    eq_diameter = 2.0 * np.sqrt(area / np.pi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        circularity = np.where(perimeter > 0, 4.0 * np.pi * area / perimeter**2, 0.0)
+
+    particles = {
+        "label": keep.astype(np.int32),
+        "area_px": area,
+        "perimeter_px": perimeter,
+        "bbox_x": stats[keep, cv2.CC_STAT_LEFT],
+        "bbox_y": stats[keep, cv2.CC_STAT_TOP],
+        "bbox_w": stats[keep, cv2.CC_STAT_WIDTH],
+        "bbox_h": stats[keep, cv2.CC_STAT_HEIGHT],
+        "centroid_x": centroids[keep, 0],
+        "centroid_y": centroids[keep, 1],
+        "eq_diameter_px": eq_diameter,
+        "circularity": circularity,
+    }
+
+    if pixel_size_mm is not None:
+        add_physical_units(particles, pixel_size_mm)
+
+    return particles
+
+
+def add_physical_units(particles, pixel_size_mm):
+    """Add millimetre columns to a particle table in place and return it."""
+    particles["area_mm2"] = particles["area_px"] * (pixel_size_mm**2)
+    particles["perimeter_mm"] = particles["perimeter_px"] * pixel_size_mm
+    particles["eq_diameter_mm"] = particles["eq_diameter_px"] * pixel_size_mm
+    return particles
+
+
+def particle_sizes(particles, column="eq_diameter_mm"):
+    """Return the size column of a particle table, or the input itself if it is already an array."""
+    if isinstance(particles, dict):
+        return np.asarray(particles[column], dtype=float)
+    return np.asarray(particles, dtype=float)
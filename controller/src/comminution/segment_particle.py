@@ -2,6 +2,10 @@ import cv2
 import numpy as np
 import random
 
+from controller.src.comminution.particle_measure import extract_component_contours, measure_particles, particle_labels
+from controller.src.dish_detection import detect_profile_circle
+from controller.src.tiling import connected_components_strips, map_strips
+
 
 def crop_circle(img, center, radius):
     rows, cols = img.shape[:2]
@@ -25,87 +29,79 @@ def crop_circle(img, center, radius):
     return crop, mask
 
 
-def segment_particles(img_bgr, thresh_s=54):
-    rows, cols, _ = img_bgr.shape
-    img_gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    img_blurred = cv2.medianBlur(img_gray, 5)
-
-    # circles = cv2.HoughCircles(
-    #     img_blurred,
-    #     cv2.HOUGH_GRADIENT,
-    #     dp=1,
-    #     minDist=120,
-    #     param1=50,
-    #     param2=51,
-    #     minRadius=1150,
-    #     maxRadius=1200,
-    # )
-
-    circles = cv2.HoughCircles(
-        img_blurred, 
-        cv2.HOUGH_GRADIENT, 
-        dp=1,             
-        minDist=150,       
-        param1=50,         
-        param2=51,         
-        minRadius=1130,     
-        maxRadius=1200      
+def _run_tiled(fn, images, tiles, halo):
+    if tiles and tiles > 1:
+        return map_strips(fn, images, tiles, halo)
+    return fn(*images)
+
+
+def _masked_saturation(img_bgr, mask):
+    s_channel = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)[:, :, 1]
+    return cv2.bitwise_and(s_channel, s_channel, mask=mask)
+
+
+# Two 7x7 closings: 2 dilations + 2 erosions of radius 3
+PARTICLE_MASK_HALO = 4 * 3
+
+
+def _particle_mask(crop_img, circle_mask_crop, threshold_value):
+    s_channel_crop = cv2.cvtColor(crop_img, cv2.COLOR_BGR2HSV)[:, :, 1]
+
+    _, mask_s = cv2.threshold(
+        s_channel_crop, threshold_value, 255, cv2.THRESH_BINARY
     )
 
+    mask_s = cv2.bitwise_and(mask_s, circle_mask_crop)
+
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+    return cv2.morphologyEx(mask_s, cv2.MORPH_CLOSE, kernel, iterations=2)
 
-    if circles is None:
+
+def segment_particles(img_bgr, thresh_s=54, pixel_size_mm=None, hough_scale=4, circle=None, tiles=None):
+    # circle: cached (x, y, r) from DishCalibration; skips Hough detection when given
+    # tiles: split into this many strips processed on a thread pool (identical output)
+    rows, cols, _ = img_bgr.shape
+
+    if circle is None:
+        circle = detect_profile_circle(img_bgr, "comminution", scale=hough_scale)
+
+    if circle is None:
         raise RuntimeError("No circles found")
 
-    x_f, y_f, r_f = circles[0, 0]
+    x_f, y_f, r_f = circle
     x, y, r = int(round(x_f)), int(round(y_f)), int(round(r_f))
 
     full_hough_mask = np.zeros((rows, cols), dtype=np.uint8)
     cv2.circle(full_hough_mask, (x, y), r - 10, 255, -1)
 
-    hsv_full = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-    s_channel_full = hsv_full[:, :, 1]
-
-    s_masked_full = cv2.bitwise_and(
-        s_channel_full, s_channel_full, mask=full_hough_mask
+    s_masked_full = _run_tiled(
+        _masked_saturation, (img_bgr, full_hough_mask), tiles, halo=0
     )
     otsu_threshold_value, _ = cv2.threshold(
         s_masked_full, thresh_s, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
     )
 
     crop_img, circle_mask_crop = crop_circle(img_bgr, (x, y), r - 10)
-    
-    hsv_crop = cv2.cvtColor(crop_img, cv2.COLOR_BGR2HSV)
-    s_channel_crop = hsv_crop[:, :, 1]
 
-    _, mask_s = cv2.threshold(
-        s_channel_crop, otsu_threshold_value, 255, cv2.THRESH_BINARY
+    mask_s = _run_tiled(
+        lambda crop, mask: _particle_mask(crop, mask, otsu_threshold_value),
+        (crop_img, circle_mask_crop),
+        tiles,
+        halo=PARTICLE_MASK_HALO,
     )
 
-    mask_s = cv2.bitwise_and(mask_s, circle_mask_crop)
-
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-    mask_s = cv2.morphologyEx(mask_s, cv2.MORPH_CLOSE, kernel, iterations=2)
-
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask_s, connectivity=8)
+    if tiles and tiles > 1:
+        num_labels, labels, stats, centroids = connected_components_strips(mask_s, tiles)
+    else:
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask_s, connectivity=8)
     print(f"[DEBUG] Connected components found: {num_labels - 1}")  
 
-    vis_img = crop_img.copy()
-    contours = []
-    valid_idx = 0
-    for i in range(1, num_labels):
-        # Create a mask for the current component to find its specific contour
-        component_mask = (labels == i).astype("uint8")
-        cnts, _ = cv2.findContours(component_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
-
-        if not cnts:
-            continue
-
-        pixel_count = stats[i, cv2.CC_STAT_AREA]
-        if pixel_count <=1:
-            continue
-
-        contours.append(cnts[0])
+    # Traced once, for the drawing and the particle perimeters
+    contours = extract_component_contours(labels, stats, particle_labels(stats))
+    particles = measure_particles(labels, stats, centroids, pixel_size_mm=pixel_size_mm, contours=contours)
 
+    vis_img = crop_img.copy()
+    for valid_idx, (i, cnt) in enumerate(zip(particles["label"], contours)):
         bx, by, bw, bh = stats[i, cv2.CC_STAT_LEFT], stats[i, cv2.CC_STAT_TOP], stats[i, cv2.CC_STAT_WIDTH], stats[i, cv2.CC_STAT_HEIGHT]
 
         color = (
@@ -113,21 +109,56 @@ def segment_particles(img_bgr, thresh_s=54):
             random.randint(50, 255),
             random.randint(50, 255),
         )
-        cv2.drawContours(vis_img, cnts, -1, color, 2)  # Draw the contour outline
+        cv2.drawContours(vis_img, [cnt], -1, color, 2)  # Draw the contour outline
         cv2.rectangle(vis_img, (bx, by), (bx + bw, by + bh), color, 2)
         cv2.putText(
             vis_img, str(valid_idx), (bx, by - 5), cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 2
         )
-        valid_idx += 1
 
-    return vis_img, crop_img, mask_s, contours
+    return vis_img, crop_img, mask_s, contours, particles
+
+
+def benchmark_contour_extraction(particle_counts=(250, 500, 1000, 2000, 4000), size=2300, seed=0):
+    """Time extract_component_contours on synthetic dishes with increasing particle counts."""
+    import time
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in particle_counts:
+        mask = np.zeros((size, size), dtype=np.uint8)
+        for x, y, r in zip(
+            rng.integers(0, size, n), rng.integers(0, size, n), rng.integers(3, 12, n)
+        ):
+            cv2.circle(mask, (int(x), int(y)), int(r), 255, -1)
+
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        label_ids = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] > 1) + 1
+
+        start = time.perf_counter()
+        extract_component_contours(labels, stats, label_ids)
+        elapsed = time.perf_counter() - start
+
+        results.append((len(label_ids), elapsed))
+        print(
+            f"[BENCH] {len(label_ids):5d} components: {elapsed * 1000:8.1f} ms "
+            f"({elapsed * 1e6 / max(len(label_ids), 1):6.1f} us/component)"
+        )
+
+    return results
 
 
 if __name__ == "__main__":
+    import sys
+
+    if "--benchmark" in sys.argv:
+        benchmark_contour_extraction()
+        sys.exit(0)
+
     img_bgr = cv2.imread(
         r"D:\workspace\wyshieh_workspace\Mastication_project\images\comminution\Image__2025-12-26__16-41-57.png"
     )
-    crop_result, mask_result, contours = segment_particles(img_bgr)
+    crop_result, _, mask_result, contours, particles = segment_particles(img_bgr)
+    print(f"[DEBUG] Particles measured: {len(particles['label'])}")
 
     cv2.imwrite("segmented_particles.png", crop_result)
     cv2.imwrite("particle_mask.png", mask_result)
@@ -0,0 +1,174 @@
+import json
+
+import numpy as np
+
+from controller.src.comminution.particle_measure import particle_sizes
+
+
+class SizeDistributionAccumulator:
+    """
+    Mergeable, weighted histogram of particle diameters.
+
+    Diameters are binned on a fixed log-spaced grid, so accumulators built from
+    different images (or processes) with the same grid merge exactly by adding
+    their bins. Quantiles such as D10/D50/D90 are interpolated inside the bins,
+    which keeps the error well below one bin width (~1.2 % at 200 bins/decade).
+
+    weighting selects the weight of each particle: "diameter" (the default,
+    same weighting as the per-image D values of particle_size_distribution),
+    "area" (pi d^2 / 4) or "count". It is stored with every summary, and
+    summaries with different weightings do not merge.
+    """
+
+    WEIGHTINGS = ("diameter", "area", "count")
+
+    def __init__(self, min_mm=0.01, max_mm=50.0, bins_per_decade=200, weighting="diameter"):
+        if weighting not in self.WEIGHTINGS:
+            raise ValueError(f"Unknown weighting {weighting!r}, expected one of {self.WEIGHTINGS}")
+
+        self.min_mm = float(min_mm)
+        self.max_mm = float(max_mm)
+        self.bins_per_decade = int(bins_per_decade)
+        self.weighting = weighting
+
+        n_bins = int(np.ceil(np.log10(self.max_mm / self.min_mm) * self.bins_per_decade))
+        self.log_edges = np.log10(self.min_mm) + np.arange(n_bins + 1) / self.bins_per_decade
+
+        # Bins 0 and -1 hold the under- and overflow outside [min_mm, max_mm)
+        self.weights = np.zeros(n_bins + 2, dtype=np.float64)
+        self.counts = np.zeros(n_bins + 2, dtype=np.int64)
+        self.min_seen = np.inf
+        self.max_seen = -np.inf
+        self.n_images = 0
+
+    def _particle_weights(self, sizes):
+        if self.weighting == "area":
+            return np.pi * sizes**2 / 4.0
+        if self.weighting == "diameter":
+            return sizes
+        return np.ones_like(sizes)
+
+    def add(self, eq_diameter_mm):
+        """Add one image's diameters (array or particle table) and return self."""
+        sizes = particle_sizes(eq_diameter_mm)
+        sizes = sizes[sizes > 0]
+
+        self.n_images += 1
+        if sizes.size == 0:
+            return self
+
+        idx = np.searchsorted(self.log_edges, np.log10(sizes), side="right")
+        self.weights += np.bincount(idx, weights=self._particle_weights(sizes), minlength=self.weights.size)
+        self.counts += np.bincount(idx, minlength=self.counts.size)
+        self.min_seen = min(self.min_seen, float(sizes.min()))
+        self.max_seen = max(self.max_seen, float(sizes.max()))
+        return self
+
+    def _check_compatible(self, other):
+        same = (
+            self.min_mm == other.min_mm and
+            self.max_mm == other.max_mm and
+            self.bins_per_decade == other.bins_per_decade and
+            self.weighting == other.weighting
+        )
+        if not same:
+            raise ValueError("Cannot merge size accumulators with different bins or weighting.")
+
+    def merge(self, other):
+        """Fold another accumulator into this one and return self."""
+        self._check_compatible(other)
+        self.weights += other.weights
+        self.counts += other.counts
+        self.min_seen = min(self.min_seen, other.min_seen)
+        self.max_seen = max(self.max_seen, other.max_seen)
+        self.n_images += other.n_images
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    @property
+    def particle_count(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """Weighted quantile(s) of the diameter in mm; q is a float or array in [0, 1]."""
+        total = self.weights.sum()
+        if total <= 0:
+            raise ValueError("No particles accumulated.")
+
+        # Bin edges in log10(mm); the outer bins stretch to the observed extremes
+        lo = min(np.log10(self.min_seen), self.log_edges[0])
+        hi = max(np.log10(self.max_seen), self.log_edges[-1])
+        edges = np.concatenate(([lo], self.log_edges, [hi]))
+
+        cdf = np.concatenate(([0.0], np.cumsum(self.weights) / total))
+        log_d = np.interp(np.asarray(q, dtype=float), cdf, edges)
+
+        d = 10.0**log_d
+        return np.clip(d, self.min_seen, self.max_seen)
+
+    def percentiles(self):
+        D10, D50, D90 = self.quantile([0.10, 0.50, 0.90])
+        return D10, D50, D90
+
+    def histogram(self):
+        """Return (edges_mm, weights, counts) for the in-range bins."""
+        return 10.0**self.log_edges, self.weights[1:-1].copy(), self.counts[1:-1].copy()
+
+    # -------------------------------------------------------------
+    # Serialization
+    # -------------------------------------------------------------
+    def to_dict(self):
+        # Only the occupied bins are stored to keep summaries small
+        nz = np.flatnonzero(self.counts)
+        return {
+            "min_mm": self.min_mm,
+            "max_mm": self.max_mm,
+            "bins_per_decade": self.bins_per_decade,
+            "weighting": self.weighting,
+            "n_images": self.n_images,
+            "min_seen": None if self.counts.sum() == 0 else self.min_seen,
+            "max_seen": None if self.counts.sum() == 0 else self.max_seen,
+            "bins": nz.tolist(),
+            "weights": self.weights[nz].tolist(),
+            "counts": self.counts[nz].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = cls(
+            min_mm=data["min_mm"],
+            max_mm=data["max_mm"],
+            bins_per_decade=data["bins_per_decade"],
+            weighting=data["weighting"],
+        )
+        bins = np.asarray(data["bins"], dtype=np.int64)
+        acc.weights[bins] = data["weights"]
+        acc.counts[bins] = data["counts"]
+        acc.n_images = data["n_images"]
+        if data["min_seen"] is not None:
+            acc.min_seen = data["min_seen"]
+            acc.max_seen = data["max_seen"]
+        return acc
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def pool_summaries(paths):
+    """Merge saved accumulator summaries (e.g. all replicates of a subject) into one."""
+    pooled = None
+    for path in paths:
+        acc = SizeDistributionAccumulator.load(path)
+        pooled = acc if pooled is None else pooled.merge(acc)
+
+    if pooled is None:
+        raise ValueError("No size summaries to pool.")
+    return pooled
@@ -0,0 +1,269 @@
+import cv2
+import numpy as np
+
+
+# Hough search ranges per rig position. The dish sits in a fixed holder, so each
+# motor position sees it at a stable center and radius.
+DISH_PROFILES = {
+    "comminution": {
+        "motor": 0,
+        "min_radius": 1130,
+        "max_radius": 1200,
+        "min_dist": 150,
+        "param1": 50,
+        "param2": 51,
+    },
+    "mixing": {
+        "motor": 140,
+        "min_radius": 730,
+        "max_radius": 800,
+        "min_dist": 120,
+        "param1": 50,
+        "param2": 51,
+    },
+}
+
+
+def _hough(img_blurred, min_dist, param1, param2, min_radius, max_radius):
+    circles = cv2.HoughCircles(
+        img_blurred,
+        cv2.HOUGH_GRADIENT,
+        dp=1,
+        minDist=min_dist,
+        param1=param1,
+        param2=param2,
+        minRadius=min_radius,
+        maxRadius=max_radius
+    )
+    if circles is None:
+        return None
+    return circles[0]
+
+
+def detect_dish_circle(
+    img_gray,
+    min_radius,
+    max_radius,
+    min_dist=120,
+    param1=50,
+    param2=51,
+    scale=4,
+    refine_band=None,
+):
+    """
+    Find the dish with a coarse-to-fine Hough transform.
+
+    The dish is first located on a 1/scale downscale of the gray image, then the
+    center and radius are refined at full resolution by a least-squares circle
+    fit to the Canny edges lying within +/- refine_band px of the coarse circle.
+    scale=1 runs the single full-resolution pass used before.
+
+    Returns (x, y, r) as floats, or None if no circle is found.
+    """
+    if scale <= 1:
+        circles = _hough(
+            cv2.medianBlur(img_gray, 5), min_dist, param1, param2, min_radius, max_radius
+        )
+        if circles is None:
+            return None
+        x, y, r = circles[0]
+        return float(x), float(y), float(r)
+
+    rows, cols = img_gray.shape[:2]
+
+    # --- Coarse pass on the downscaled image ---
+    small = cv2.resize(
+        img_gray, (cols // scale, rows // scale), interpolation=cv2.INTER_AREA
+    )
+    small = cv2.medianBlur(small, 3)
+
+    # Edge votes shrink with the circumference, so the accumulator threshold does too
+    coarse = _hough(
+        small,
+        max(min_dist / scale, 1),
+        param1,
+        max(param2 / scale, 8),
+        int(np.floor(min_radius / scale)),
+        int(np.ceil(max_radius / scale)),
+    )
+    if coarse is None:
+        print("[DEBUG] Coarse dish detection failed → full-resolution Hough.")
+        return detect_dish_circle(
+            img_gray, min_radius, max_radius, min_dist, param1, param2, scale=1
+        )
+
+    x0, y0, r0 = (float(v) * scale for v in coarse[0])
+
+    # --- Fine pass: circle fit to full-resolution edges in a narrow annulus ---
+    band = refine_band if refine_band is not None else 2 * scale + 2
+
+    margin = r0 + band + 3
+    wx1 = max(int(x0 - margin), 0)
+    wy1 = max(int(y0 - margin), 0)
+    wx2 = min(int(x0 + margin) + 1, cols)
+    wy2 = min(int(y0 + margin) + 1, rows)
+
+    window = cv2.medianBlur(np.ascontiguousarray(img_gray[wy1:wy2, wx1:wx2]), 5)
+    # Same edge thresholds HOUGH_GRADIENT derives from param1
+    edges = cv2.Canny(window, param1 / 2, param1)
+    ys, xs = np.nonzero(edges)
+    xs = xs.astype(np.float64) + wx1
+    ys = ys.astype(np.float64) + wy1
+
+    fit = _refine_circle(xs, ys, (x0, y0, r0), band)
+    if fit is None or not (min_radius <= fit[2] <= max_radius):
+        print("[DEBUG] Fine dish refinement failed → using coarse estimate.")
+        return x0, y0, r0
+
+    return fit
+
+
+def _fit_circle(xs, ys):
+    # Algebraic (Kasa) least-squares fit: x^2 + y^2 + D x + E y + F = 0
+    A = np.column_stack([xs, ys, np.ones_like(xs)])
+    rhs = -(xs**2 + ys**2)
+    (D, E, F), *_ = np.linalg.lstsq(A, rhs, rcond=None)
+    cx, cy = -D / 2.0, -E / 2.0
+    r_sq = cx**2 + cy**2 - F
+    if r_sq <= 0:
+        return None
+    return cx, cy, np.sqrt(r_sq)
+
+
+def _refine_circle(xs, ys, circle, band, iterations=3, min_points=50):
+    x, y, r = circle
+    for _ in range(iterations):
+        # Keep edge points near the current circle, then drop outliers from
+        # particles touching the rim before refitting
+        dist = np.hypot(xs - x, ys - y)
+        near = np.abs(dist - r) <= band
+        if np.count_nonzero(near) < min_points:
+            return None
+
+        residual = dist[near] - r
+        mad = np.median(np.abs(residual - np.median(residual))) + 1e-6
+        inlier = np.abs(residual - np.median(residual)) <= 3.0 * 1.4826 * mad
+
+        fit = _fit_circle(xs[near][inlier], ys[near][inlier])
+        if fit is None:
+            return None
+        x, y, r = fit
+        band = max(band / 2.0, 2.0)
+
+    return float(x), float(y), float(r)
+
+
+def detect_profile_circle(img_bgr, position, scale=4):
+    """Run the full dish detection with the Hough ranges of a rig position."""
+    profile = DISH_PROFILES[position]
+    img_gray = img_bgr if img_bgr.ndim == 2 else cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    return detect_dish_circle(
+        img_gray,
+        min_radius=profile["min_radius"],
+        max_radius=profile["max_radius"],
+        min_dist=profile["min_dist"],
+        param1=profile["param1"],
+        param2=profile["param2"],
+        scale=scale,
+    )
+
+
+def check_dish_ring(img, circle, offset=6, samples=180, min_contrast=15, min_fraction=0.6):
+    """
+    Cheap check that a known circle still sits on the dish rim.
+
+    Samples the brightness just inside and just outside the circle at `samples`
+    angles and requires at least min_fraction of the in-frame angles to show a
+    step of min_contrast gray levels. Works on gray or BGR images without
+    converting the whole frame.
+    """
+    x, y, r = circle
+    rows, cols = img.shape[:2]
+
+    theta = np.linspace(0.0, 2.0 * np.pi, samples, endpoint=False)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+
+    xi = np.rint(x + (r - offset) * cos_t).astype(np.int64)
+    yi = np.rint(y + (r - offset) * sin_t).astype(np.int64)
+    xo = np.rint(x + (r + offset) * cos_t).astype(np.int64)
+    yo = np.rint(y + (r + offset) * sin_t).astype(np.int64)
+
+    in_frame = (
+        (xi >= 0) & (xi < cols) & (yi >= 0) & (yi < rows) &
+        (xo >= 0) & (xo < cols) & (yo >= 0) & (yo < rows)
+    )
+    if np.count_nonzero(in_frame) < samples // 4:
+        return False
+
+    inner = img[yi[in_frame], xi[in_frame]].astype(np.float32)
+    outer = img[yo[in_frame], xo[in_frame]].astype(np.float32)
+    if inner.ndim == 2:
+        # BGR samples → luma, same weights as COLOR_BGR2GRAY
+        weights = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+        inner = inner @ weights
+        outer = outer @ weights
+
+    contrast = np.abs(inner - outer)
+    return np.count_nonzero(contrast >= min_contrast) >= min_fraction * contrast.size
+
+
+def benchmark_dish_detection(
+    img_gray, min_radius, max_radius, scales=(4, 8), truth=None, tolerance_px=3.0, **hough_kwargs
+):
+    """
+    Compare coarse-to-fine detection against the full-resolution Hough on one image.
+
+    Deviations are measured against truth when it is given (synthetic frames),
+    otherwise against the full-resolution result.
+    """
+    import time
+
+    start = time.perf_counter()
+    reference = detect_dish_circle(img_gray, min_radius, max_radius, scale=1, **hough_kwargs)
+    ref_time = time.perf_counter() - start
+
+    expected = truth if truth is not None else reference
+    results = {1: (reference, ref_time)}
+    for scale in (1,) + tuple(scales):
+        if scale == 1:
+            circle, elapsed = reference, ref_time
+        else:
+            start = time.perf_counter()
+            circle = detect_dish_circle(img_gray, min_radius, max_radius, scale=scale, **hough_kwargs)
+            elapsed = time.perf_counter() - start
+            results[scale] = (circle, elapsed)
+
+        if circle is None or expected is None:
+            print(f"[BENCH] 1/{scale}: {circle} in {elapsed * 1000:.1f} ms")
+            continue
+
+        dev = max(abs(a - b) for a, b in zip(circle, expected))
+        status = "OK" if dev <= tolerance_px else "OUT OF TOLERANCE"
+        print(
+            f"[BENCH] 1/{scale}: ({circle[0]:.1f}, {circle[1]:.1f}, {circle[2]:.1f}) "
+            f"in {elapsed * 1000:.1f} ms, max deviation {dev:.2f} px [{status}]"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        img_gray = cv2.imread(sys.argv[1], cv2.IMREAD_GRAYSCALE)
+        benchmark_dish_detection(img_gray, 1130, 1200, min_dist=150)
+        benchmark_dish_detection(img_gray, 730, 800, min_dist=120)
+    else:
+        # Synthetic 4200x2160 frames with a bright dish on a dark holder,
+        # sized like the comminution and the mixing dish
+        rng = np.random.default_rng(0)
+        for circle, radii, min_dist in (
+            ((2113, 1081, 1167), (1130, 1200), 150),
+            ((2087, 1069, 761), (730, 800), 120),
+        ):
+            img_gray = rng.normal(40, 8, (2160, 4200)).clip(0, 255).astype(np.uint8)
+            cv2.circle(img_gray, circle[:2], circle[2], 170, -1)
+            img_gray = cv2.GaussianBlur(img_gray, (5, 5), 0)
+            print(f"[BENCH] synthetic dish {circle}")
+            benchmark_dish_detection(img_gray, *radii, truth=circle, min_dist=min_dist)
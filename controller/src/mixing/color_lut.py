@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+
+import cv2
+import numpy as np
+
+# Bump when the way tables are built changes, so stale cache files are ignored
+LUT_VERSION = 1
+
+# Unmixed-area color classes: ranges of a* and b* (OpenCV LAB minus 128),
+# optionally L (0..255). A pixel takes the first class whose ranges all match;
+# 0 is "no class".
+UAF_CLASSES = (
+    ("green", {"a": (-80, -30), "b": (0, 50)}),
+    ("red", {"a": (30, 80), "b": (0, 50)}),
+)
+
+_memory_cache = {}
+
+
+def lut_key(classes, bits):
+    payload = json.dumps(
+        {"classes": [[name, rules] for name, rules in classes], "bits": bits, "version": LUT_VERSION},
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def build_color_lut(classes=UAF_CLASSES, bits=8):
+    """
+    Evaluate the class rules once for every quantized BGR color.
+
+    Returns a uint8 table of shape (2**bits,) * 3 indexed by [b, g, r] >> (8 - bits).
+    With bits=8 every 8-bit color has its own entry, so lookups reproduce the
+    per-pixel LAB rules exactly; fewer bits trade accuracy at class borders
+    for a smaller table.
+    """
+    if len(classes) > 255:
+        raise ValueError("At most 255 color classes fit in a uint8 lookup table.")
+
+    levels = 1 << bits
+    step = 256 // levels
+    values = (np.arange(levels) * step + step // 2).astype(np.uint8)
+
+    # Every quantized color as one (levels^2, levels) BGR image, converted in a single call
+    b, g, r = np.meshgrid(values, values, values, indexing="ij")
+    colors = np.stack([b, g, r], axis=-1).reshape(levels * levels, levels, 3)
+    lab = cv2.cvtColor(colors, cv2.COLOR_BGR2LAB).reshape(-1, 3)
+
+    channels = {
+        "L": lab[:, 0].astype(np.int16),
+        "a": lab[:, 1].astype(np.int16) - 128,
+        "b": lab[:, 2].astype(np.int16) - 128,
+    }
+
+    lut = np.zeros(lab.shape[0], dtype=np.uint8)
+    for class_id, (_, rules) in enumerate(classes, start=1):
+        match = lut == 0
+        for channel, (lo, hi) in rules.items():
+            match &= (channels[channel] >= lo) & (channels[channel] <= hi)
+        lut[match] = class_id
+
+    return lut.reshape(levels, levels, levels)
+
+
+def load_color_lut(classes=UAF_CLASSES, bits=8, cache_dir="cache/color_lut"):
+    """Return the lookup table for these classes, from memory, disk, or built and cached."""
+    key = lut_key(classes, bits)
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    path = os.path.join(cache_dir, f"lut_{key}.npy") if cache_dir else None
+    if path and os.path.exists(path):
+        lut = np.load(path)
+    else:
+        lut = build_color_lut(classes, bits)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path, lut)
+            print(f"[DEBUG] Color lookup table cached at {path}")
+
+    _memory_cache[key] = lut
+    return lut
+
+
+def classify_pixels(img_bgr, lut, index=None):
+    """
+    Class id of every pixel (2-D), or of the flat pixel indices in `index` (1-D).
+
+    The table's bit depth is taken from its shape.
+    """
+    shift = 8 - int(np.log2(lut.shape[0]))
+    pixels = img_bgr.reshape(-1, 3)
+    if index is not None:
+        pixels = pixels[index]
+
+    b, g, r = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+    if shift:
+        b, g, r = b >> shift, g >> shift, r >> shift
+
+    classes = lut[b, g, r]
+    if index is None:
+        return classes.reshape(img_bgr.shape[:2])
+    return classes
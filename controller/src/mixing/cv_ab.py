@@ -1,37 +1,88 @@
+import cv2
 import numpy as np
-from scipy.stats import entropy
+
+# Block size of the local a*b* variance; sensor ROIs keep their offsets on this grid
+LOCAL_VARIANCE_BLOCK = 16
 
 def compute_cv_ab(img_lab, mask):
-    a = img_lab[:, :, 1].astype(np.float32)
-    b = img_lab[:, :, 2].astype(np.float32)
-    a = a[mask > 0]
-    b = b[mask > 0]
+    a = img_lab[:, :, 1][mask > 0]
+    b = img_lab[:, :, 2][mask > 0]
+    return compute_cv_ab_from_pixels(a, b)
+
+def compute_cv_ab_from_pixels(a, b):
+    # a, b: gathered a*/b* values of the gum pixels (e.g. FrameContext.gum_pixels("lab", 1))
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
     mean_ab = np.sqrt(np.mean(a)**2 + np.mean(b)**2)
     std_ab = np.sqrt(np.var(a) + np.var(b))
 
     return std_ab / mean_ab
 
-def compute_local_variance(img_lab, mask, block_size=16):
-    a = img_lab[:, :, 1].astype(np.float32)
-    b = img_lab[:, :, 2].astype(np.float32)
+def build_ab_integrals(img_lab, mask):
+    """
+    Integral images of the masked a*, b* channels, their squares and the mask.
+
+    Any block statistic of the gum pixels (count, mean, variance) then costs
+    four lookups per table, whatever the block size.
+    """
+    m = (mask > 0).astype(np.uint8)
+    a = cv2.bitwise_and(img_lab[:, :, 1], img_lab[:, :, 1], mask=m)
+    b = cv2.bitwise_and(img_lab[:, :, 2], img_lab[:, :, 2], mask=m)
+
+    sum_a, sq_a = cv2.integral2(a, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    sum_b, sq_b = cv2.integral2(b, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+    return {
+        "n": cv2.integral(m, sdepth=cv2.CV_64F),
+        "a": sum_a,
+        "a2": sq_a,
+        "b": sum_b,
+        "b2": sq_b,
+    }
+
+def _block_sums(table, ys, xs, block_size):
+    y0, x0 = np.meshgrid(ys, xs, indexing="ij")
+    y1, x1 = y0 + block_size, x0 + block_size
+    return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+def local_variance_map(integrals, block_size=16, min_coverage=0.5):
+    """
+    var(a*) + var(b*) of the gum pixels in every block_size x block_size block.
+
+    Blocks are laid out like the original loop (full blocks starting at 0,
+    block_size, ... < h - block_size), so an ROI frame matches the full
+    sensor only when its offset is a multiple of block_size (see dish_roi). Blocks whose gum coverage is below
+    min_coverage are NaN. Returns (variance_map, mean_variance).
+    """
+    h, w = integrals["n"].shape[0] - 1, integrals["n"].shape[1] - 1
+    ys = np.arange(0, h - block_size, block_size)
+    xs = np.arange(0, w - block_size, block_size)
 
-    h, w = a.shape
-    local_vars = []
+    if ys.size == 0 or xs.size == 0:
+        return np.empty((ys.size, xs.size)), 0.0
 
-    for y in range(0, h - block_size, block_size):
-        for x in range(0, w - block_size, block_size):
-            block_mask = mask[y:y+block_size, x:x+block_size]
+    n = _block_sums(integrals["n"], ys, xs, block_size)
+    valid = n >= min_coverage * block_size * block_size
+    n_safe = np.where(valid, n, 1.0)
 
-            if np.sum(block_mask) < 0.5 * block_size * block_size:
-                continue
+    var_map = np.full(n.shape, np.nan)
+    for ch in ("a", "b"):
+        mean = _block_sums(integrals[ch], ys, xs, block_size) / n_safe
+        mean_sq = _block_sums(integrals[ch + "2"], ys, xs, block_size) / n_safe
+        var = np.maximum(mean_sq - mean**2, 0.0)
+        var_map = np.where(valid, np.nan_to_num(var_map) + var, np.nan)
 
-            a_block = a[y:y+block_size, x:x+block_size][block_mask]
-            b_block = b[y:y+block_size, x:x+block_size][block_mask]
+    if not valid.any():
+        return var_map, 0.0
 
-            var_block = np.var(a_block) + np.var(b_block)
-            local_vars.append(var_block)
+    return var_map, float(np.mean(var_map[valid]))
 
-    if len(local_vars):
-        return 0.0
+def compute_local_variance(img_lab, mask, block_size=LOCAL_VARIANCE_BLOCK):
+    _, mean_var = local_variance_map(build_ab_integrals(img_lab, mask), block_size)
+    return mean_var
 
-    return np.mean(local_vars)
+def compute_multiscale_variance(img_lab, mask, block_sizes=(8, 16, 32, 64), integrals=None):
+    """Block-variance maps and means for several block sizes from one set of integral images."""
+    if integrals is None:
+        integrals = build_ab_integrals(img_lab, mask)
+    return {bs: local_variance_map(integrals, bs) for bs in block_sizes}
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """
+    Lazily computed color planes of one frame, shared by every mixing metric.
+
+    gray/HSV/LAB conversions, the per-channel split, the gum-masked images and
+    the gather of masked pixels are each done at most once per frame. Every
+    access is counted, so conversion_stats() reports how many conversions the
+    separate per-metric code paths would have done and how many were avoided.
+    """
+
+    _CONVERSIONS = {
+        "gray": cv2.COLOR_BGR2GRAY,
+        "hsv": cv2.COLOR_BGR2HSV,
+        "lab": cv2.COLOR_BGR2LAB,
+    }
+
+    def __init__(self, img_bgr, gum_mask=None):
+        self.img_bgr = img_bgr
+        self._cache = {}
+        self.requests = {}
+        self.computed = {}
+        self.gum_mask = gum_mask
+
+    # -------------------------------------------------------------
+    # Cache bookkeeping
+    # -------------------------------------------------------------
+    def _get(self, key, compute):
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if key not in self._cache:
+            self._cache[key] = compute()
+            self.computed[key] = self.computed.get(key, 0) + 1
+        return self._cache[key]
+
+    def conversion_stats(self):
+        """Color conversions requested vs performed, plus (requests, computes) per cached item."""
+        requested = sum(self.requests.get(key, 0) for key in self._CONVERSIONS)
+        performed = sum(self.computed.get(key, 0) for key in self._CONVERSIONS)
+        return {
+            "conversions_requested": requested,
+            "conversions_performed": performed,
+            "conversions_avoided": requested - performed,
+            "per_item": {key: (self.requests[key], self.computed.get(key, 0)) for key in self.requests},
+        }
+
+    # -------------------------------------------------------------
+    # Color planes
+    # -------------------------------------------------------------
+    def plane(self, name):
+        return self._get(name, lambda: cv2.cvtColor(self.img_bgr, self._CONVERSIONS[name]))
+
+    @property
+    def gray(self):
+        return self.plane("gray")
+
+    @property
+    def hsv(self):
+        return self.plane("hsv")
+
+    @property
+    def lab(self):
+        return self.plane("lab")
+
+    def channels(self, name):
+        """Contiguous single-channel planes of a color space, split once."""
+        return self._get(name + "_split", lambda: cv2.split(self.plane(name)))
+
+    # -------------------------------------------------------------
+    # Gum mask and masked views
+    # -------------------------------------------------------------
+    @property
+    def gum_mask(self):
+        return self._gum_mask
+
+    @gum_mask.setter
+    def gum_mask(self, mask):
+        self._gum_mask = mask
+        # Everything derived from the previous mask is stale
+        for key in [k for k in self._cache if k.startswith("gum_") or k.startswith("masked_")]:
+            del self._cache[key]
+
+    @property
+    def gum_index(self):
+        """Flat indices of the gum pixels, gathered once and reused by every metric."""
+        if self._gum_mask is None:
+            raise ValueError("FrameContext has no gum mask yet.")
+        return self._get("gum_index", lambda: np.flatnonzero(self._gum_mask.ravel()))
+
+    def gum_pixels(self, name, channel):
+        """Values of one channel of a color space at the gum pixels (1-D array)."""
+        return self._get(
+            f"gum_{name}_{channel}",
+            lambda: self.channels(name)[channel].ravel()[self.gum_index],
+        )
+
+    def masked(self, name="bgr"):
+        """The frame (or a converted plane) with everything outside the gum set to zero."""
+        def compute():
+            img = self.img_bgr if name == "bgr" else self.plane(name)
+            return cv2.bitwise_and(img, img, mask=self._gum_mask)
+
+        return self._get(f"masked_{name}", compute)
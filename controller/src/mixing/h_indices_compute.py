@@ -1,6 +1,39 @@
 import numpy as np
 
+# OpenCV hue is stored in 2-degree steps (0..179), so every 8-bit hue value maps
+# to one of 180 angles; their cos/sin are computed once.
+HUE_BINS = 180
+_HUE_RAD = np.arange(HUE_BINS) * np.pi / 90.0
+_HUE_COS = np.cos(_HUE_RAD)
+_HUE_SIN = np.sin(_HUE_RAD)
+
+def compute_hue_from_histogram(hist_h):
+    # hist_h: 180-bin hue histogram of the gum pixels (counts, e.g. from cv2.calcHist)
+    counts = np.asarray(hist_h, dtype=np.float64).ravel()
+    total = counts.sum()
+
+    # Circular components
+    C = np.dot(counts, _HUE_COS) / total
+    S = np.dot(counts, _HUE_SIN) / total
+
+    # Resultant vector length
+    R = np.sqrt(C**2 + S**2)
+
+    # Circular variance
+    voh = 1.0 - R
+
+    # SDHue
+    sdhue = np.sqrt(voh)
+
+    return voh, sdhue
+
 def compute_hue(hue_array_degree):
+    hue_array_degree = np.asarray(hue_array_degree)
+
+    if np.issubdtype(hue_array_degree.dtype, np.integer):
+        # 8-bit hue: count each value once instead of a cos/sin per pixel
+        hist_h = np.bincount(hue_array_degree.ravel(), minlength=HUE_BINS)
+        return compute_hue_from_histogram(hist_h[:HUE_BINS])
 
     # Convert degrees to radians
     hue_rad = hue_array_degree * np.pi / 90.0
@@ -18,4 +51,4 @@ def compute_hue(hue_array_degree):
     # SDHue
     sdhue = np.sqrt(voh)
 
-    return voh, sdhue
\ No newline at end of file
+    return voh, sdhue
@@ -1,12 +1,21 @@
 import cv2
-import matplotlib.pyplot as plt
-
-def get_hsv_histogram_figure(h_channel, s_channel, v_channel, mask):
 
+def compute_hsv_histograms(h_channel, s_channel, v_channel, mask):
+    # Raw counts; the hue histogram doubles as input for compute_hue_from_histogram
     hist_h = cv2.calcHist([h_channel], [0], mask, [180], [0, 180])
     hist_s = cv2.calcHist([s_channel], [0], mask, [256], [0, 256])
     hist_v = cv2.calcHist([v_channel], [0], mask, [256], [0, 256])
 
+    return hist_h, hist_s, hist_v
+
+def get_hsv_histogram_figure(h_channel, s_channel, v_channel, mask, histograms=None):
+    # histograms: (hist_h, hist_s, hist_v) from compute_hsv_histograms, to avoid recounting
+    import matplotlib.pyplot as plt
+
+    if histograms is None:
+        histograms = compute_hsv_histograms(h_channel, s_channel, v_channel, mask)
+    hist_h, hist_s, hist_v = histograms
+
     hist_h = hist_h / hist_h.sum() if hist_h.sum() > 0 else hist_h
     hist_s = hist_s / hist_s.sum() if hist_s.sum() > 0 else hist_s
     hist_v = hist_v / hist_v.sum() if hist_v.sum() > 0 else hist_v
@@ -18,4 +27,4 @@ def get_hsv_histogram_figure(h_channel, s_channel, v_channel, mask):
     ax.legend()
     plt.tight_layout()
 
-    return fig
\ No newline at end of file
+    return fig
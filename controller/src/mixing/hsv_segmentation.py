@@ -1,47 +1,36 @@
 import cv2
 import numpy as np
 
-def hsv_segmentation(img_bgr: np.ndarray, hsv_lower = 54, hsv_upper=255):
-    rows, cols, _ = img_bgr.shape
-    img_gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    img_blurred_hough = cv2.medianBlur(img_gray, 5)
-
-    circles = cv2.HoughCircles(
-        img_blurred_hough, 
-        cv2.HOUGH_GRADIENT, 
-        dp=1, 
-        minDist=120, 
-        param1=50, 
-        param2=51, 
-        minRadius=730, 
-        maxRadius=800
-    )
+from controller.src.dish_detection import detect_profile_circle
+from controller.src.tiling import map_strips
 
-    hough_circle_mask = np.zeros((rows, cols), dtype=np.uint8)
+def _run_tiled(fn, images, tiles, halo):
+    if tiles and tiles > 1:
+        return map_strips(fn, images, tiles, halo)
+    return fn(*images)
 
-    if circles is not None:
-        circles = np.uint16(np.around(circles))
-        x, y, r = circles[0, 0]
-
-        cv2.circle(hough_circle_mask, (x, y), r, 255, thickness=-1)
-        print(f"[DEBUG] Hough Circle FOUND: Center=({x}, {y}), Radius={r}")
-    else:
-        hough_circle_mask[:] = 255
-        print("[DEBUG] WARNING: No Hough circle detected → using full mask.")
 
+def _blurred_saturation(img_bgr, hough_circle_mask):
     img_bgr_cropped = cv2.bitwise_and(img_bgr, img_bgr, mask=hough_circle_mask)
     
     img_hsv = cv2.cvtColor(img_bgr_cropped, cv2.COLOR_BGR2HSV)
-    h_channel, s_channel, v_channel = cv2.split(img_hsv)
+    s_channel = img_hsv[:, :, 1]
 
-    s_channel_blurred = cv2.medianBlur(s_channel, 3)
+    return cv2.medianBlur(s_channel, 3)
 
-    
+
+def _blurred_masked_channel(s_channel, hough_circle_mask):
+    # S of the circle-masked BGR frame equals the frame's S masked by the circle
+    return cv2.medianBlur(cv2.bitwise_and(s_channel, s_channel, mask=hough_circle_mask), 3)
+
+
+# 25x25 closing (radius 12 twice), 9x9 dilate (4) and 11x11 erode (5)
+GUM_MASK_HALO = 12 + 12 + 4 + 5
+
+
+def _gum_mask(s_channel_blurred, hough_circle_mask, threshold_value, hsv_upper):
     _, foreground_mask_saturation = cv2.threshold(
-        s_channel_blurred, 
-        hsv_lower, 
-        hsv_upper, 
-        cv2.THRESH_BINARY + cv2.THRESH_OTSU
+        s_channel_blurred, threshold_value, hsv_upper, cv2.THRESH_BINARY
     )
 
     kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (25, 25))
@@ -56,7 +45,53 @@ def hsv_segmentation(img_bgr: np.ndarray, hsv_lower = 54, hsv_upper=255):
     kernel_sharpen = np.ones((11, 11), np.uint8)
     segmentation_mask = cv2.erode(mask_filled, kernel_sharpen, iterations=1)
 
-    final_mask = cv2.bitwise_and(segmentation_mask, hough_circle_mask)
+    return cv2.bitwise_and(segmentation_mask, hough_circle_mask)
+
+
+def hsv_segmentation(img_bgr: np.ndarray, hsv_lower = 54, hsv_upper=255, hough_scale=4, circle=None, tiles=None, frame=None):
+    # circle: cached (x, y, r) from DishCalibration; skips Hough detection when given
+    # tiles: split into this many strips processed on a thread pool (identical output)
+    # frame: FrameContext of img_bgr; reuses its gray/HSV planes instead of converting again
+    rows, cols, _ = img_bgr.shape
+
+    if circle is None:
+        circle = detect_profile_circle(
+            frame.gray if frame is not None else img_bgr, "mixing", scale=hough_scale
+        )
+
+    hough_circle_mask = np.zeros((rows, cols), dtype=np.uint8)
+
+    if circle is not None:
+        x, y, r = (int(round(v)) for v in circle)
+
+        cv2.circle(hough_circle_mask, (x, y), r, 255, thickness=-1)
+        print(f"[DEBUG] Hough Circle FOUND: Center=({x}, {y}), Radius={r}")
+    else:
+        hough_circle_mask[:] = 255
+        print("[DEBUG] WARNING: No Hough circle detected → using full mask.")
+
+    if frame is not None:
+        s_channel_blurred = _run_tiled(
+            _blurred_masked_channel, (frame.channels("hsv")[1], hough_circle_mask), tiles, halo=1
+        )
+    else:
+        s_channel_blurred = _run_tiled(
+            _blurred_saturation, (img_bgr, hough_circle_mask), tiles, halo=1
+        )
+
+    otsu_threshold_value, _ = cv2.threshold(
+        s_channel_blurred, 
+        hsv_lower, 
+        hsv_upper, 
+        cv2.THRESH_BINARY + cv2.THRESH_OTSU
+    )
+
+    final_mask = _run_tiled(
+        lambda s, mask: _gum_mask(s, mask, otsu_threshold_value, hsv_upper),
+        (s_channel_blurred, hough_circle_mask),
+        tiles,
+        halo=GUM_MASK_HALO,
+    )
 
     return final_mask
     
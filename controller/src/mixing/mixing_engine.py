@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+
+from controller.src.mixing.color_lut import UAF_CLASSES
+from controller.src.mixing.h_indices_compute import compute_hue_from_histogram
+from controller.src.mixing.histogram import compute_hsv_histograms
+
+
+def _bin_range(value_range):
+    """Inclusive a*/b* range (OpenCV value minus 128) as a slice of histogram bins."""
+    lo, hi = (int(np.clip(v + 128, 0, 255)) for v in value_range)
+    return slice(lo, hi + 1)
+
+
+class MixingHistograms:
+    """
+    Compact per-frame summary of the gum pixels: a joint 256x256 a*b* histogram
+    plus the H/S/V histograms.
+
+    Every histogram-based mixing metric (VOH/SDHue, CV_ab, UAF) is derived from
+    these counts, so adding a metric or re-evaluating UAF under new a*/b*
+    thresholds never touches the pixels again.
+    """
+
+    def __init__(self, hist_ab, hist_h, hist_s, hist_v):
+        self.hist_ab = np.asarray(hist_ab, dtype=np.float64)
+        self.hist_h = hist_h
+        self.hist_s = hist_s
+        self.hist_v = hist_v
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Count the gum pixels of a FrameContext (gum_mask must be set)."""
+        _, a, b = frame.channels("lab")
+        hist_ab = cv2.calcHist([a, b], [0, 1], frame.gum_mask, [256, 256], [0, 256, 0, 256])
+        hist_h, hist_s, hist_v = compute_hsv_histograms(*frame.channels("hsv"), frame.gum_mask)
+        return cls(hist_ab, hist_h, hist_s, hist_v)
+
+    @property
+    def pixel_count(self):
+        return float(self.hist_ab.sum())
+
+    @property
+    def hsv_histograms(self):
+        return self.hist_h, self.hist_s, self.hist_v
+
+    def hue_stats(self):
+        return compute_hue_from_histogram(self.hist_h)
+
+    def ab_moments(self):
+        """Mean and (population) variance of a* and b* as stored by OpenCV (0..255)."""
+        total = self.pixel_count
+        levels = np.arange(256, dtype=np.float64)
+
+        p_a = self.hist_ab.sum(axis=1) / total
+        p_b = self.hist_ab.sum(axis=0) / total
+
+        mean_a = np.dot(p_a, levels)
+        mean_b = np.dot(p_b, levels)
+        var_a = np.dot(p_a, (levels - mean_a) ** 2)
+        var_b = np.dot(p_b, (levels - mean_b) ** 2)
+        return mean_a, mean_b, var_a, var_b
+
+    def cv_ab(self):
+        mean_a, mean_b, var_a, var_b = self.ab_moments()
+        mean_ab = np.sqrt(mean_a**2 + mean_b**2)
+        std_ab = np.sqrt(var_a + var_b)
+
+        return std_ab / mean_ab
+
+    def region_fraction(self, a_range, b_range):
+        """Fraction of gum pixels with a*, b* (OpenCV value minus 128) inside both inclusive ranges."""
+        total = self.pixel_count
+        if total == 0:
+            return 0.0
+        return float(self.hist_ab[_bin_range(a_range), _bin_range(b_range)].sum() / total)
+
+    def uaf(self, classes=UAF_CLASSES):
+        """Area fraction per color class; classes use the a*/b* rules of color_lut."""
+        fractions = {}
+        claimed = np.zeros_like(self.hist_ab, dtype=bool)
+        total = self.pixel_count
+
+        for name, rules in classes:
+            if set(rules) - {"a", "b"}:
+                raise ValueError(f"Class {name!r} uses rules that an a*b* histogram cannot evaluate.")
+
+            region = np.zeros_like(claimed)
+            region[_bin_range(rules.get("a", (-128, 127))), _bin_range(rules.get("b", (-128, 127)))] = True
+
+            # First matching class wins, as in the lookup table
+            region &= ~claimed
+            claimed |= region
+            fractions[name] = float(self.hist_ab[region].sum() / total) if total else 0.0
+
+        return fractions
@@ -0,0 +1,48 @@
+from controller.src.mixing.cv_ab import LOCAL_VARIANCE_BLOCK, compute_local_variance
+from controller.src.mixing.uaf_compute import analyze_unmixed_area_fraction
+from controller.src.mixing.color_lut import UAF_CLASSES, load_color_lut
+from controller.src.mixing.mixing_engine import MixingHistograms
+
+
+def compute_mixing_metrics(frame, with_masks=False, lut_cache_dir="cache/color_lut"):
+    """
+    All mixing metrics of one frame from a FrameContext whose gum_mask is set.
+
+    Returns a dict with voh, sdhue, cv_ab, local_var_ab (mean 16x16 block
+    variance of a*b*), uaf_green, uaf_red, uaf_total, hsv_histograms for
+    get_hsv_histogram_figure and the MixingHistograms summary. The green/red
+    unmixed-region masks are only built when with_masks is set.
+    """
+    # One joint a*b* histogram and one HSV histogram pass feed every scalar metric
+    histograms = MixingHistograms.from_frame(frame)
+
+    voh, sdhue = histograms.hue_stats()
+    cv_ab = histograms.cv_ab()
+    uaf = histograms.uaf(UAF_CLASSES)
+
+    local_var_ab = compute_local_variance(frame.lab, frame.gum_mask, block_size=LOCAL_VARIANCE_BLOCK)
+
+    green_mask = red_mask = None
+    if with_masks:
+        # Green/red classification is one lookup per gum pixel in a table built once per thresholds
+        _, _, _, green_mask, red_mask = analyze_unmixed_area_fraction(
+            frame.img_bgr,
+            frame.gum_mask,
+            lut=load_color_lut(UAF_CLASSES, cache_dir=lut_cache_dir),
+            gum_index=frame.gum_index,
+            classes=UAF_CLASSES,
+        )
+
+    return {
+        "voh": voh,
+        "sdhue": sdhue,
+        "cv_ab": cv_ab,
+        "local_var_ab": local_var_ab,
+        "uaf_green": uaf.get("green", 0.0),
+        "uaf_red": uaf.get("red", 0.0),
+        "uaf_total": sum(uaf.values()),
+        "green_mask": green_mask,
+        "red_mask": red_mask,
+        "hsv_histograms": histograms.hsv_histograms,
+        "histograms": histograms,
+    }
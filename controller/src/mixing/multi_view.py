@@ -0,0 +1,208 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from controller.src.mixing.frame_context import FrameContext
+from controller.src.mixing.hsv_segmentation import hsv_segmentation
+from controller.src.mixing.mixing_metrics import compute_mixing_metrics
+from controller.src.tiling import default_workers
+from model.raw_frame import as_bgr
+
+# Metrics reported per view and aggregated across views
+SCALAR_METRICS = ("voh", "sdhue", "cv_ab", "local_var_ab", "uaf_green", "uaf_red", "uaf_total")
+
+# Main capture plus the four side-lit captures
+MAX_VIEWS = 5
+
+# File name suffixes (after "<cycles>_") that save_mixing_data_side_1/_2 give the
+# side-lit views: "<view>_<side>", so every file belongs to exactly one side.
+SIDE_VIEW_SUFFIXES = {
+    side: {f"side_{view}": f"{view}_{side}" for view in range(1, MAX_VIEWS)}
+    for side in ("1", "2")
+}
+
+_view_pool = None
+
+
+def _init_worker(threads):
+    # Keep OpenCV's own thread pool from oversubscribing the cores shared by the workers
+    cv2.setNumThreads(threads)
+
+
+def get_view_pool():
+    """Process pool for view analysis, started once and reused so workers spawn only once."""
+    global _view_pool
+    if _view_pool is None:
+        workers = min(MAX_VIEWS, default_workers())
+        threads = max(1, default_workers() // workers)
+        _view_pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(threads,)
+        )
+    return _view_pool
+
+
+def shutdown_view_pool():
+    global _view_pool
+    if _view_pool is not None:
+        _view_pool.shutdown(wait=False, cancel_futures=True)
+        _view_pool = None
+
+
+def analyze_view(img_bgr, circle=None, hsv_lower=54, hsv_upper=255, tiles=None):
+    """Segment one view and return its scalar mixing metrics (picklable, for the pool)."""
+    start = time.perf_counter()
+    # Raw Bayer captures are demosaiced here, in the worker
+    img_bgr = as_bgr(img_bgr)
+
+    frame = FrameContext(img_bgr)
+    frame.gum_mask = hsv_segmentation(
+        img_bgr, hsv_lower, hsv_upper, circle=circle, tiles=tiles, frame=frame
+    )
+    metrics = compute_mixing_metrics(frame)
+
+    result = {key: float(metrics[key]) for key in SCALAR_METRICS}
+    result["gum_pixels"] = int(metrics["histograms"].pixel_count)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def submit_views(views, circle=None, executor=None, tiles=None):
+    """
+    Start analyze_view for every (name, image) in `views` on the pool.
+
+    Returns {name: future}, so the caller can analyze another view (e.g. the
+    main one it also displays) in the meantime.
+    """
+    executor = executor or get_view_pool()
+    return {
+        name: executor.submit(analyze_view, img, circle, tiles=tiles)
+        for name, img in views
+        if img is not None
+    }
+
+
+def collect_views(futures):
+    """Wait for submitted views; a failed view is reported as {"error": message}."""
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"[DEBUG] Mixing analysis of view {name} failed: {e}")
+            results[name] = {"error": str(e)}
+    return results
+
+
+def aggregate_view_metrics(per_view):
+    """Mean, std, min and max of every scalar metric over the views that succeeded."""
+    valid = [m for m in per_view.values() if "error" not in m]
+    aggregate = {"views": len(valid)}
+    if not valid:
+        return aggregate
+
+    for key in SCALAR_METRICS:
+        values = np.array([m[key] for m in valid], dtype=np.float64)
+        aggregate[key] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
+    return aggregate
+
+
+def analyze_mixing_views(views, circle=None, executor=None, tiles=None):
+    """
+    Analyze all views concurrently.
+
+    views is a list of (name, img_bgr). circle is the dish circle shared by all
+    views (they are taken at the same motor position), so Hough detection is
+    not repeated per view. Returns {"per_view", "aggregate", "seconds"}.
+    """
+    start = time.perf_counter()
+    per_view = collect_views(submit_views(views, circle, executor, tiles))
+    return {
+        "per_view": per_view,
+        "aggregate": aggregate_view_metrics(per_view),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def parse_side_view(path):
+    """(side, view name) of a saved side-lit capture, or None if `path` is not one."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = stem.partition("_")[2]
+    return next(
+        (
+            (side, name)
+            for side, views in SIDE_VIEW_SUFFIXES.items()
+            for name, view_suffix in views.items()
+            if view_suffix == suffix
+        ),
+        None,
+    )
+
+
+def side_view_paths(main_path):
+    """
+    Side-lit captures saved next to a main mixing image <cycles>_<side>.png.
+
+    The view file names per side are in SIDE_VIEW_SUFFIXES; returns
+    [(name, path)] for those that exist.
+    """
+    folder, filename = os.path.split(main_path)
+    stem, ext = os.path.splitext(filename)
+    cycles, _, side = stem.rpartition("_")
+    if not cycles or side not in SIDE_VIEW_SUFFIXES:
+        return []
+
+    paths = []
+    for name, suffix in SIDE_VIEW_SUFFIXES[side].items():
+        path = os.path.join(folder, f"{cycles}_{suffix}{ext}")
+        if os.path.exists(path):
+            paths.append((name, path))
+    return paths
+
+
+def format_view_summary(result):
+    """One log line per view plus the aggregate, for the main window log."""
+    lines = []
+    for name, metrics in result["per_view"].items():
+        if "error" in metrics:
+            lines.append(f"{name}: failed ({metrics['error']})")
+            continue
+        lines.append(
+            f"{name}: VOH {metrics['voh']:.4f}, SDHue {metrics['sdhue']:.4f}, "
+            f"CV_ab {metrics['cv_ab']:.4f}, UAF {metrics['uaf_total']:.4f} ({metrics['seconds']:.2f} s)"
+        )
+
+    aggregate = result["aggregate"]
+    if aggregate["views"]:
+        lines.append(
+            f"All {aggregate['views']} views: "
+            + ", ".join(
+                f"{key} {aggregate[key]['mean']:.4f}±{aggregate[key]['std']:.4f}"
+                for key in ("voh", "sdhue", "cv_ab", "uaf_total")
+            )
+        )
+    lines.append(f"Multi-view analysis took {result['seconds']:.2f} s")
+    return lines
+
+
+if __name__ == "__main__":
+    import sys
+
+    main_path = sys.argv[1]
+    views = [("main", cv2.imread(main_path))]
+    views += [(name, cv2.imread(path)) for name, path in side_view_paths(main_path)]
+
+    # One view on its own for reference, then all of them on the pool
+    single = analyze_view(views[0][1])
+    result = analyze_mixing_views(views)
+    for line in format_view_summary(result):
+        print(line)
+    print(f"Single view: {single['seconds']:.2f} s, {len(views)} views: {result['seconds']:.2f} s")
+    shutdown_view_pool()
@@ -1,10 +1,12 @@
 import numpy as np
 import cv2
-import matplotlib.pyplot as plt
 
-def extract_unmixed_regions(img_bgr, gum_mask):
+from controller.src.mixing.color_lut import UAF_CLASSES, classify_pixels
 
-    lab = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2LAB)
+def extract_unmixed_regions(img_bgr, gum_mask, lab=None):
+    # lab: precomputed LAB image (e.g. FrameContext.lab) to skip the conversion
+    if lab is None:
+        lab = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2LAB)
     a = lab[:, :, 1].astype(np.int16) - 128
     b = lab[:, :, 2].astype(np.int16) - 128
 
@@ -25,6 +27,29 @@ def extract_unmixed_regions(img_bgr, gum_mask):
         red_mask.astype(np.uint8) * 255
     )
 
+def classify_gum_pixels(img_bgr, gum_mask, lut, gum_index=None):
+    """Color class id (see color_lut) of every gum pixel, one table lookup each."""
+    if gum_index is None:
+        gum_index = np.flatnonzero(gum_mask.ravel())
+    return gum_index, classify_pixels(img_bgr, lut, gum_index)
+
+def class_masks(shape, gum_index, class_ids, classes):
+    """{name: 0/255 mask} for each (name, rules) class, ids 1.. in order as in color_lut."""
+    masks = {}
+    for class_id, (name, _) in enumerate(classes, start=1):
+        mask = np.zeros(shape, dtype=np.uint8)
+        mask.ravel()[gum_index[class_ids == class_id]] = 255
+        masks[name] = mask
+    return masks
+
+def class_area_fractions(class_ids, classes):
+    """{name: fraction of the gum area} for each (name, rules) class, ids 1.. in order."""
+    counts = np.bincount(class_ids, minlength=len(classes) + 1)
+    return {
+        name: float(counts[class_id] / class_ids.size) if class_ids.size else 0.0
+        for class_id, (name, _) in enumerate(classes, start=1)
+    }
+
 def compute_uaf(gum_mask, color_mask):
     A_total = np.count_nonzero(gum_mask)
     A_color = np.count_nonzero(color_mask)
@@ -34,8 +59,23 @@ def compute_uaf(gum_mask, color_mask):
 
     return A_color / A_total
 
-def analyze_unmixed_area_fraction(img, gum_mask):
-    green_mask, red_mask = extract_unmixed_regions(img, gum_mask)
+def analyze_unmixed_area_fraction(img, gum_mask, lab=None, lut=None, gum_index=None, classes=UAF_CLASSES):
+    # lut: table from color_lut.load_color_lut(classes); classifies gum pixels by lookup.
+    # The total covers every class; green/red are reported by name (0 if the LUT has no such class)
+    if lut is not None:
+        gum_index, class_ids = classify_gum_pixels(img, gum_mask, lut, gum_index)
+        fractions = class_area_fractions(class_ids, classes)
+        masks = class_masks(gum_mask.shape, gum_index, class_ids, classes)
+        empty = np.zeros(gum_mask.shape, dtype=np.uint8)
+        return (
+            fractions.get("green", 0.0),
+            fractions.get("red", 0.0),
+            sum(fractions.values()),
+            masks.get("green", empty),
+            masks.get("red", empty),
+        )
+
+    green_mask, red_mask = extract_unmixed_regions(img, gum_mask, lab=lab)
 
     uaf_green = compute_uaf(gum_mask, green_mask)
     uaf_red = compute_uaf(gum_mask, red_mask)
@@ -45,6 +85,7 @@ def analyze_unmixed_area_fraction(img, gum_mask):
 
 if __name__ == "__main__":
     import cv2
+    import matplotlib.pyplot as plt
     from hsv_segmentation import hsv_segmentation
 
     img_bgr = cv2.imread(r"D:\workspace\wyshieh_workspace\Mastication_project\images\mixing\multi_shot\Ting\10_1.png")
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from model.raw_frame import RawFrame
+
+# Bump whenever an analysis change alters results, so older entries stop matching
+ANALYSIS_VERSION = 1
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (float, np.floating)):
+        # Rounded so that e.g. a re-saved calibration does not change every key
+        return round(float(value), 4)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _flatten(result, prefix=""):
+    items = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            items.update(_flatten(value, name + "/"))
+        else:
+            items[name] = np.asarray(value)
+    return items
+
+
+def _unflatten(arrays):
+    result = {}
+    for name, value in arrays.items():
+        node = result
+        *parents, leaf = name.split("/")
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value.item() if value.ndim == 0 else value
+    return result
+
+
+class ResultCache:
+    """
+    Disk cache of analysis results, keyed by image content and stage parameters.
+
+    Each entry is one compressed .npz holding a (possibly nested) dict of
+    arrays and scalars. Hits refresh the file's modification time, and when
+    the cache grows past max_bytes the least recently used entries are
+    removed first.
+    """
+
+    def __init__(self, root="cache/results", max_bytes=2 * 1024**3):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, img, stage, **params):
+        if isinstance(img, RawFrame):
+            # Keyed on the mosaic itself, no need to demosaic for a lookup
+            img, params = img.bayer, {**params, "bayer_pattern": img.pattern}
+        digest = hashlib.blake2b(digest_size=20)
+        img = np.ascontiguousarray(img)
+        digest.update(memoryview(img).cast("B"))
+        digest.update(json.dumps(
+            {
+                "stage": stage,
+                "shape": img.shape,
+                "dtype": str(img.dtype),
+                "params": _jsonable(params),
+                "version": ANALYSIS_VERSION,
+            },
+            sort_keys=True,
+        ).encode())
+        return f"{stage}_{digest.hexdigest()}"
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.npz")
+
+    def get(self, key):
+        """The stored result dict, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                result = _unflatten({name: data[name] for name in data.files})
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+
+        # Written under a temporary name so a crash never leaves a truncated entry;
+        # per process, as batch workers share the cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **_flatten(result))
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return []
+        return [e for e in os.scandir(self.root) if e.is_file() and e.name.endswith(".npz")]
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Evicted meanwhile by another process using the same cache
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort(key=lambda item: item[0])
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            print(f"[DEBUG] Evicted cached result {entry.name}")
+
+    def clear(self):
+        for entry in self._entries():
+            os.remove(entry.path)
@@ -0,0 +1,159 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+def default_workers():
+    return max(os.cpu_count() or 1, 1)
+
+
+def strip_bounds(rows, n_strips, halo=0):
+    """
+    Split `rows` into horizontal strips, yielding (r0, r1, h0, h1).
+
+    [r0, r1) is the strip itself and [h0, h1) the strip plus a halo of `halo`
+    rows on each side, clipped to the image. Strips start on even rows so that
+    2x2-block labeling sees the same blocks as on the whole image.
+    """
+    n_strips = max(1, min(n_strips, rows // 2))
+    step = -(-rows // n_strips)
+    step += step % 2
+
+    for r0 in range(0, rows, step):
+        r1 = min(r0 + step, rows)
+        yield r0, r1, max(r0 - halo, 0), min(r1 + halo, rows)
+
+
+def map_strips(fn, images, n_strips, halo, executor=None):
+    """
+    Apply fn to matching horizontal strips of `images` in parallel.
+
+    fn receives the strips (with halo) of every image and returns one array of
+    the same height. The halo rows are cut off again and the strips are stacked,
+    so as long as halo covers the reach of fn (e.g. the sum of structuring
+    element radii) the result equals fn applied to the whole images.
+    """
+    rows = images[0].shape[0]
+    bounds = list(strip_bounds(rows, n_strips, halo))
+
+    def run(bound):
+        r0, r1, h0, h1 = bound
+        out = fn(*(img[h0:h1] for img in images))
+        return out[r0 - h0: r1 - h0]
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=min(default_workers(), len(bounds))) as pool:
+            parts = list(pool.map(run, bounds))
+    else:
+        parts = list(executor.map(run, bounds))
+
+    return np.concatenate(parts, axis=0)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def connected_components_strips(mask, n_strips, executor=None):
+    """
+    cv2.connectedComponentsWithStats(mask, connectivity=8), labeled strip by strip.
+
+    Each strip is labeled on its own thread, components touching across a seam
+    are merged with a union-find over the seam rows, and stats and centroids
+    are combined from integer sums. Labels are numbered in the same order as
+    OpenCV's (first 2x2 block in raster order), so the output is identical to
+    the untiled call.
+    """
+    rows = mask.shape[0]
+    bounds = list(strip_bounds(rows, n_strips))
+
+    def run(bound):
+        r0, r1, _, _ = bound
+        return cv2.connectedComponentsWithStats(
+            np.ascontiguousarray(mask[r0:r1]), connectivity=8
+        )
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=min(default_workers(), len(bounds))) as pool:
+            results = list(pool.map(run, bounds))
+    else:
+        results = list(executor.map(run, bounds))
+
+    # Provisional ids: background is 0, strip k's local label j maps to offsets[k] + j - 1
+    counts = [n - 1 for n, _, _, _ in results]
+    offsets = np.concatenate(([1], 1 + np.cumsum(counts)[:-1])).astype(np.int64)
+    total = 1 + sum(counts)
+
+    parent = list(range(total))
+    for k in range(len(bounds) - 1):
+        upper = results[k][1][-1]
+        lower = results[k + 1][1][0]
+        for shift in (-1, 0, 1):
+            if shift < 0:
+                a, b = upper[-shift:], lower[:shift]
+            elif shift > 0:
+                a, b = upper[:-shift], lower[shift:]
+            else:
+                a, b = upper, lower
+            touch = (a > 0) & (b > 0)
+            pairs = np.unique(
+                np.stack([a[touch] + offsets[k] - 1, b[touch] + offsets[k + 1] - 1], axis=1),
+                axis=0,
+            )
+            for p, q in pairs:
+                rp, rq = _find(parent, p), _find(parent, q)
+                if rp != rq:
+                    # Keep the earliest provisional id as root, like OpenCV's union
+                    parent[max(rp, rq)] = min(rp, rq)
+
+    roots = np.array([_find(parent, i) for i in range(total)], dtype=np.int64)
+    unique_roots, final = np.unique(roots, return_inverse=True)
+    num_labels = len(unique_roots)
+
+    labels = np.empty(mask.shape, dtype=np.int32)
+    area = np.zeros(num_labels, dtype=np.int64)
+    left = np.full(num_labels, np.iinfo(np.int64).max)
+    top = np.full(num_labels, np.iinfo(np.int64).max)
+    right = np.full(num_labels, -1, dtype=np.int64)
+    bottom = np.full(num_labels, -1, dtype=np.int64)
+    sum_x = np.zeros(num_labels, dtype=np.float64)
+    sum_y = np.zeros(num_labels, dtype=np.float64)
+
+    for (r0, r1, _, _), offset, (n, strip_labels, stats, centroids) in zip(bounds, offsets, results):
+        lut = np.empty(n, dtype=np.int32)
+        lut[0] = 0
+        lut[1:] = final[offset: offset + n - 1]
+        labels[r0:r1] = lut[strip_labels]
+
+        a = stats[:, cv2.CC_STAT_AREA].astype(np.int64)
+        present = a > 0
+        np.add.at(area, lut, a)
+        np.minimum.at(left, lut[present], stats[present, cv2.CC_STAT_LEFT])
+        np.minimum.at(top, lut[present], stats[present, cv2.CC_STAT_TOP] + r0)
+        np.maximum.at(right, lut[present], stats[present, cv2.CC_STAT_LEFT] + stats[present, cv2.CC_STAT_WIDTH])
+        np.maximum.at(bottom, lut[present], stats[present, cv2.CC_STAT_TOP] + stats[present, cv2.CC_STAT_HEIGHT] + r0)
+        # Centroids are sum/area in double, so the integer sums round-trip exactly
+        np.add.at(sum_x, lut[present], np.rint(centroids[present, 0] * a[present]))
+        np.add.at(sum_y, lut[present], np.rint(centroids[present, 1] * a[present]) + r0 * a[present])
+
+    stats = np.zeros((num_labels, 5), dtype=np.int32)
+    stats[:, cv2.CC_STAT_LEFT] = left
+    stats[:, cv2.CC_STAT_TOP] = top
+    stats[:, cv2.CC_STAT_WIDTH] = right - left
+    stats[:, cv2.CC_STAT_HEIGHT] = bottom - top
+    stats[:, cv2.CC_STAT_AREA] = area
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centroids = np.column_stack([sum_x / area, sum_y / area])
+
+    if area[0] == 0:
+        # All-foreground mask: OpenCV reports placeholder stats for the empty background
+        stats[0] = results[0][2][0]
+        centroids[0] = np.nan
+
+    return num_labels, labels, stats, centroids
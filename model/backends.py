@@ -0,0 +1,56 @@
+# model/backends.py
+# Pick the camera and serial implementations by name, importing only the one used.
+
+
+def create_rig(simulated=None):
+    """Motor/LED state shared by a simulated camera and serial port."""
+    from model.simulated import SimulatedRig
+
+    simulated = simulated or {}
+    return SimulatedRig(
+        motor_speed=simulated.get("motor_speed", 200.0),
+        led_rise_time=simulated.get("led_rise_time", 0.05),
+    )
+
+
+def create_camera(backend="pylon", simulated=None, rig=None, **camera_config):
+    """CameraModel on the first pylon device for "pylon", on a SimulatedCamera for "simulated"."""
+    from model.camera_model import CameraModel
+
+    if backend == "pylon":
+        return CameraModel(**camera_config)
+
+    if backend == "simulated":
+        from model.simulated import SimulatedCamera
+
+        simulated = simulated or {}
+        device = SimulatedCamera(
+            sensor_size=(camera_config.get("width", 4200), camera_config.get("height", 2160)),
+            source=simulated.get("images") or None,
+            grab_latency=simulated.get("grab_latency", 0.03),
+            rig=rig,
+        )
+        return CameraModel(**camera_config, device=device)
+
+    raise ValueError(f"Unknown camera backend {backend!r}")
+
+
+def create_serial(backend="pyserial", port="COM9", baudrate=115200, ack_timeout=None, simulated=None, rig=None):
+    """SerialModel on a real port for "pyserial", on a SimulatedSerialPort for "simulated"."""
+    from model.serial_model import SerialModel
+
+    if backend == "pyserial":
+        return SerialModel(port, baudrate, ack_timeout=ack_timeout)
+
+    if backend == "simulated":
+        from model.simulated import SimulatedSerialPort
+
+        simulated = simulated or {}
+        transport = SimulatedSerialPort(
+            rig=rig,
+            ack_delay=simulated.get("ack_delay", 0.01),
+            ack_after_motion=simulated.get("ack_after_motion", False),
+        )
+        return SerialModel(port, baudrate, ack_timeout=ack_timeout, transport=transport)
+
+    raise ValueError(f"Unknown serial backend {backend!r}")
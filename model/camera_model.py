@@ -1,8 +1,12 @@
+import time
+
 import pypylon.pylon as pylon
 import cv2
 
+from model.raw_frame import RawFrame
+
 class CameraModel:
-    def __init__(self, height=2160, width=4200, exposure_time=5000, exposure_auto='Off', gain=0.0, gain_auto='Off', whitebalance_auto='Once'):
+    def __init__(self, height=2160, width=4200, exposure_time=5000, exposure_auto='Off', gain=0.0, gain_auto='Off', whitebalance_auto='Once', raw_bayer=False, device=None):
         
         # 1. Initialize core attributes
         self.height = height
@@ -12,18 +16,34 @@ class CameraModel:
         self.gain = gain
         self.gain_auto = gain_auto
         self.whitebalance_auto = whitebalance_auto
+        # Session grabs of a Bayer stream return RawFrames, debayered when color is needed
+        self.raw_bayer = raw_bayer
+        self.bayer_pattern = None
+        # Sensor ROI (offset_x, offset_y, width, height); None = full width x height
+        self.roi = None
+        # InstantCamera-like device to use instead of the first pylon device (see model.simulated)
+        self.device = device
         self.camera = None
         self.converter = None
+        # Persistent session state: None (single-shot), "trigger" or "continuous"
+        self.session_mode = None
+        # Named capture profiles and the last value written to each settings node
+        self.profiles = {}
+        self.active_profile = None
+        self._node_values = {}
         self._initialize_camera()
 
     def _initialize_camera(self):
         """Connects to the Basler camera and sets up the ImageFormatConverter."""
         try:
-            # Get the Factory Instance
-            tlFactory = pylon.TlFactory.GetInstance()
-            
-            # Create InstantCamera for the first device found
-            self.camera = pylon.InstantCamera(tlFactory.CreateFirstDevice())
+            if self.device is not None:
+                self.camera = self.device
+            else:
+                # Get the Factory Instance
+                tlFactory = pylon.TlFactory.GetInstance()
+
+                # Create InstantCamera for the first device found
+                self.camera = pylon.InstantCamera(tlFactory.CreateFirstDevice())
             self.camera.Open()
 
             # --- Improvement: Set RAW format for the camera so WhiteBalance works ---
@@ -31,13 +51,17 @@ class CameraModel:
             if self.whitebalance_auto != 'Off':
                 # Set camera to RAW mode for automatic White Balance to function
                 # Use BayerGB8 or BayerRG8 depending on your camera model
-                self.camera.PixelFormat.SetValue('BayerGB8') 
+                self._set_pixel_format('BayerGB8')
                 print("[DEBUG] Camera PixelFormat set to BayerGB8 for Auto White Balance.")
             else:
                  # If Auto White Balance is off, setting BGR8packed can reduce CPU load
-                self.camera.PixelFormat.SetValue('BGR8packed')
+                self._set_pixel_format('BGR8packed')
 
 
+            pixel_format = self.camera.PixelFormat.GetValue()
+            if pixel_format.startswith("Bayer") and pixel_format.endswith("8"):
+                self.bayer_pattern = pixel_format[5:7]
+
             # Set up the ImageFormatConverter for OpenCV (BGR8)
             self.converter = pylon.ImageFormatConverter()
             self.converter.OutputPixelFormat = pylon.PixelType_BGR8packed
@@ -56,6 +80,14 @@ class CameraModel:
             self.camera = None
 
 
+    def _set_pixel_format(self, pixel_format):
+        # Devices without the format (e.g. the pylon camera emulation) keep their
+        # own; the ImageFormatConverter still delivers BGR8
+        if pixel_format in self.camera.PixelFormat.Symbolics:
+            self.camera.PixelFormat.SetValue(pixel_format)
+        else:
+            print(f"[DEBUG] PixelFormat {pixel_format} not supported, keeping {self.camera.PixelFormat.GetValue()}.")
+
     def _apply_settings(self):
         """Applies configuration parameters to the camera using GenICam nodes."""
         if not self.camera or not self.camera.IsOpen():
@@ -73,28 +105,207 @@ class CameraModel:
             self.camera.Height.SetValue(self.height)
             
             # Configure Exposure Time
-            self.camera.ExposureAuto.SetValue(self.exposure_auto)
+            self._node_values.clear()
+            self._write_node("ExposureAuto", self.exposure_auto)
             if self.exposure_auto == 'Off':
-                # --- Improvement: Ensure the value is within Min/Max limits ---
-                current_exp = max(self.camera.ExposureTime.GetMin(), self.exposure_time)
-                current_exp = min(self.camera.ExposureTime.GetMax(), current_exp)
-                self.camera.ExposureTime.SetValue(current_exp)
+                self._write_node("ExposureTime", self._clamp("ExposureTime", self.exposure_time))
 
             # Configure Gain
-            self.camera.GainAuto.SetValue(self.gain_auto)
+            self._write_node("GainAuto", self.gain_auto)
             if self.gain_auto == 'Off':
-                # --- Improvement: Ensure the value is within Min/Max limits ---
-                current_gain = max(self.camera.Gain.GetMin(), self.gain)
-                current_gain = min(self.camera.Gain.GetMax(), current_gain)
-                self.camera.Gain.SetValue(current_gain)
+                self._write_node("Gain", self._clamp("Gain", self.gain))
 
-            self.camera.BalanceWhiteAuto.SetValue(self.whitebalance_auto)
+            self._write_node("BalanceWhiteAuto", self.whitebalance_auto)
                 
             print(f"[DEBUG] Configuration applied: WxH={self.camera.Width.GetValue()}x{self.camera.Height.GetValue()}, Exp={self.camera.ExposureTime.GetValue()} us.")
 
         except pylon.RuntimeException as e:
             print(f"Pylon error when applying settings: {e}")
 
+    def _clamp(self, node_name, value):
+        # Keep the value within the node's Min/Max limits
+        node = getattr(self.camera, node_name)
+        return min(node.GetMax(), max(node.GetMin(), value))
+
+    def _write_node(self, node_name, value):
+        """Set a node unless it already holds the value last written; returns the number of writes."""
+        if self._node_values.get(node_name) == value:
+            return 0
+        getattr(self.camera, node_name).SetValue(value)
+        self._node_values[node_name] = value
+        return 1
+
+    # -------------------------------------------------------------
+    # Capture profiles: exposure/gain/white balance per lighting setup
+    # -------------------------------------------------------------
+    def roi_increments(self):
+        """(Width, Height, OffsetX, OffsetY) step sizes of the sensor."""
+        return tuple(getattr(self.camera, name).Inc for name in ("Width", "Height", "OffsetX", "OffsetY"))
+
+    def set_roi(self, roi=None):
+        """
+        Crop the sensor to `roi` (see model.camera_roi), or back to the full frame for None.
+
+        The image size cannot change while grabbing, so a running session is
+        restarted; setting the ROI already in use costs nothing.
+        """
+        if roi == self.roi:
+            return
+        if not self.is_open():
+            raise RuntimeError("Camera is not initialized or connected.")
+
+        mode = self.session_mode
+        if mode is not None:
+            self.stop_session()
+
+        offset_x, offset_y, width, height = roi or (0, 0, self.width, self.height)
+        # Offsets go to 0 first so the new size always fits the sensor
+        self.camera.OffsetX.SetValue(0)
+        self.camera.OffsetY.SetValue(0)
+        self.camera.Width.SetValue(width)
+        self.camera.Height.SetValue(height)
+        self.camera.OffsetX.SetValue(offset_x)
+        self.camera.OffsetY.SetValue(offset_y)
+        self.roi = roi
+        print(f"[DEBUG] Camera ROI set to {width}x{height} at ({offset_x}, {offset_y}).")
+
+        if mode is not None:
+            self.start_session(mode)
+
+    def set_frame_rate(self, fps=None):
+        """
+        Limit the free-running rate of continuous sessions to `fps` (None = as fast as possible).
+
+        Returns False when the camera has no AcquisitionFrameRate control.
+        """
+        if not self.is_open():
+            raise RuntimeError("Camera is not initialized or connected.")
+        try:
+            if fps is None:
+                self.camera.AcquisitionFrameRateEnable.SetValue(False)
+            else:
+                self.camera.AcquisitionFrameRateEnable.SetValue(True)
+                self.camera.AcquisitionFrameRate.SetValue(self._clamp("AcquisitionFrameRate", float(fps)))
+        except (AttributeError, pylon.GenericException) as e:
+            print(f"[DEBUG] Frame rate control not available: {e}")
+            return False
+        print(f"[DEBUG] Camera frame rate {'unlimited' if fps is None else f'set to {fps} fps'}.")
+        return True
+
+    def define_profile(self, name, exposure_time=None, gain=None, whitebalance_auto=None):
+        """Register a named profile; settings left as None are not touched when switching."""
+        settings = {"exposure_time": exposure_time, "gain": gain, "whitebalance_auto": whitebalance_auto}
+        self.profiles[name] = {key: value for key, value in settings.items() if value is not None}
+
+    def use_profile(self, name):
+        """
+        Switch to a named profile between shots and return the number of node writes.
+
+        The camera stays open and the stream keeps running: exposure, gain and
+        white balance nodes are writable while grabbing, and in a trigger
+        session the next grab_next() frame is the first one exposed with the
+        new values. Only nodes whose value differs from the last write are set,
+        so alternating "main"/"side" costs one or two writes per switch.
+        """
+        if name not in self.profiles:
+            raise ValueError(f"Unknown capture profile {name!r}")
+        if not self.is_open():
+            raise RuntimeError("Camera is not initialized or connected.")
+
+        profile = self.profiles[name]
+        writes = 0
+        if "exposure_time" in profile:
+            writes += self._write_node("ExposureAuto", "Off")
+            writes += self._write_node("ExposureTime", self._clamp("ExposureTime", profile["exposure_time"]))
+        if "gain" in profile:
+            writes += self._write_node("GainAuto", "Off")
+            writes += self._write_node("Gain", self._clamp("Gain", profile["gain"]))
+        if "whitebalance_auto" in profile:
+            writes += self._write_node("BalanceWhiteAuto", profile["whitebalance_auto"])
+
+        self.active_profile = name
+        print(f"[DEBUG] Capture profile {name!r} active ({writes} node writes).")
+        return writes
+
+    def is_open(self):
+        return self.camera is not None and self.camera.IsOpen()
+
+    # -------------------------------------------------------------
+    # Persistent session: the stream stays up between shots
+    # -------------------------------------------------------------
+    def start_session(self, mode="trigger", num_buffers=8):
+        """
+        Start grabbing once and keep the stream running until stop_session().
+
+        mode="trigger": the camera waits for a software trigger, so grab_next()
+        returns a frame exposed after the call (e.g. after an LED change).
+        mode="continuous": the camera streams freely and grab_latest() returns
+        the newest finished frame.
+        The num_buffers grab buffers are allocated once at stream start and
+        recycled.
+        """
+        if not self.is_open():
+            raise RuntimeError("Camera is not initialized or connected.")
+        if mode not in ("trigger", "continuous"):
+            raise ValueError(f"Unknown session mode {mode!r}")
+
+        if self.camera.IsGrabbing():
+            self.camera.StopGrabbing()
+
+        self.camera.MaxNumBuffer.SetValue(num_buffers)
+        self.camera.TriggerSelector.SetValue("FrameStart")
+        if mode == "trigger":
+            self.camera.TriggerMode.SetValue("On")
+            self.camera.TriggerSource.SetValue("Software")
+            self.camera.StartGrabbing(pylon.GrabStrategy_OneByOne)
+        else:
+            self.camera.TriggerMode.SetValue("Off")
+            self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+
+        self.session_mode = mode
+        print(f"[DEBUG] Camera session started ({mode}, {num_buffers} buffers).")
+
+    def stop_session(self):
+        if self.is_open() and self.camera.IsGrabbing():
+            self.camera.StopGrabbing()
+        if self.is_open() and self.session_mode == "trigger":
+            self.camera.TriggerMode.SetValue("Off")
+        self.session_mode = None
+
+    def _retrieve(self, timeout_ms):
+        grabResult = self.camera.RetrieveResult(timeout_ms, pylon.TimeoutHandling_ThrowException)
+        try:
+            if not grabResult.GrabSucceeded():
+                print(f"[DEBUG] Grab failed: {grabResult.ErrorCode} {grabResult.ErrorDescription}")
+                return None
+            # Copy out (exactly once), so the caller owns the frame while the buffers keep cycling
+            if self.raw_bayer and self.bayer_pattern is not None:
+                return RawFrame(grabResult.GetArray(), self.bayer_pattern)
+            if self.converter.ImageHasDestinationFormat(grabResult):
+                return grabResult.GetArray()
+            return self.converter.Convert(grabResult).GetArray()
+        finally:
+            grabResult.Release()
+
+    def grab_next(self, timeout_ms=5000):
+        """A frame whose exposure starts after this call."""
+        if self.session_mode == "trigger":
+            if self.camera.WaitForFrameTriggerReady(timeout_ms, pylon.TimeoutHandling_ThrowException):
+                self.camera.ExecuteSoftwareTrigger()
+            return self._retrieve(timeout_ms)
+
+        # Continuous: drop the frame already waiting, then take the one after it
+        stale = self.camera.RetrieveResult(0, pylon.TimeoutHandling_Return)
+        if stale is not None and stale.IsValid():
+            stale.Release()
+        return self._retrieve(timeout_ms)
+
+    def grab_latest(self, timeout_ms=5000):
+        """The newest finished frame (continuous sessions); triggers one otherwise."""
+        if self.session_mode != "continuous":
+            return self.grab_next(timeout_ms)
+        return self._retrieve(timeout_ms)
+
     # -------------------------------------------------------------
     # Core method: Capture Image
     # -------------------------------------------------------------
@@ -103,6 +314,19 @@ class CameraModel:
         if not self.camera or not self.camera.IsOpen():
             print("[DEBUG] Cannot capture image. Camera is not initialized or connected.")
             return None
+
+        if self.session_mode is not None:
+            try:
+                img_bgr = self.grab_next()
+                if img_bgr is not None:
+                    print("[DEBUG] Image captured successfully.")
+                return img_bgr
+            except pylon.TimeoutException:
+                print("[DEBUG] Timeout occurred while capturing image.")
+                return None
+            except pylon.RuntimeException as e:
+                print(f"[DEBUG] Runtime error while capturing image: {e}")
+                return None
         
         grabResult = None
         
@@ -147,8 +371,25 @@ class CameraModel:
     # -------------------------------------------------------------
     # Core method: Record Video
     # -------------------------------------------------------------
-    def record_video(self):
-        pass
+    def record_video(self, size=(960, 540), target_fps=15.0, path=None, container="raw", ring_frames=16):
+        """
+        Without `path`: live preview, a continuous latest-image session read by
+        a grab thread; returns the running LivePreview.
+        With `path`: record to disk (see model.video_recorder); returns the
+        running VideoRecorder.
+        Either one's stop() restores the previous session.
+        """
+        if not self.is_open():
+            print("[DEBUG] Cannot record. Camera is not initialized or connected.")
+            return None
+        if path is not None:
+            from model.video_recorder import start_recording
+
+            return start_recording(self, path, container, ring_frames, fps=target_fps)
+
+        from model.live_preview import start_live_preview
+
+        return start_live_preview(self, size, target_fps)
 
 
     # -------------------------------------------------------------
@@ -156,6 +397,7 @@ class CameraModel:
     # -------------------------------------------------------------
     def close(self):
         """Closes the camera connection and cleans up resources."""
+        self.session_mode = None
         if self.camera and self.camera.IsOpen():
             # Ensure grabbing is stopped before closing
             if self.camera.IsGrabbing():
@@ -166,11 +408,82 @@ class CameraModel:
         # Removed cv2.destroyAllWindows() from here (it belongs in the calling function)
 
 
+def benchmark_shot_latency(shots=5, make_device=None, **camera_config):
+    """
+    Shot-to-shot latency of the old open/capture/close path vs persistent sessions.
+
+    make_device() returns a fresh device for each CameraModel (e.g. a
+    model.simulated.SimulatedCamera when no camera is attached); by default the
+    first pylon device is used. Raises if any path captures no frames.
+    """
+    def open_camera():
+        return CameraModel(**camera_config, device=make_device() if make_device else None)
+
+    def time_shots(grab):
+        per_shot, captured = [], 0
+        for _ in range(shots):
+            start = time.perf_counter()
+            captured += grab() is not None
+            per_shot.append(time.perf_counter() - start)
+        return 1000 * sum(per_shot) / shots, captured
+
+    # Old path: a new CameraModel and a StartGrabbing(1)/StopGrabbing() per shot
+    def reopen_and_capture():
+        cam = open_camera()
+        try:
+            return cam.capture_image()
+        finally:
+            cam.close()
+
+    results = {}
+    results["reopen_ms"], captured = time_shots(reopen_and_capture)
+    counts = {"reopen": captured}
+
+    # Sessions: open once, then one software trigger per shot / the newest streamed frame
+    for mode, grab_name in (("trigger", "grab_next"), ("continuous", "grab_latest")):
+        start = time.perf_counter()
+        cam = open_camera()
+        if not cam.is_open():
+            raise RuntimeError("Camera is not initialized or connected.")
+        cam.start_session(mode)
+        results[f"{mode}_setup_ms"] = 1000 * (time.perf_counter() - start)
+        results[f"{mode}_ms"], counts[mode] = time_shots(getattr(cam, grab_name))
+        cam.close()
+
+    failed = [path for path, captured in counts.items() if captured < shots]
+    if failed:
+        raise RuntimeError(f"No frame captured on some shots of: {', '.join(failed)} ({counts})")
+
+    print(f"[DEBUG] Reopen per shot: {results['reopen_ms']:.1f} ms/shot")
+    for mode in ("trigger", "continuous"):
+        print(
+            f"[DEBUG] Persistent {mode} session: {results[f'{mode}_ms']:.1f} ms/shot "
+            f"after {results[f'{mode}_setup_ms']:.1f} ms setup"
+        )
+    return results
+
+
 # =================================================================
 #                         USAGE EXAMPLE / TEST SECTION
 # =================================================================
 
 if __name__ == '__main__':
+    import sys
+
+    if "--benchmark" in sys.argv:
+        # Simulated device when no Basler camera is attached (pylon's camera
+        # emulation lacks nodes CameraModel sets, so it cannot stand in)
+        make_device = None
+        if not pylon.TlFactory.GetInstance().EnumerateDevices():
+            from model.simulated import SimulatedCamera
+
+            print("[DEBUG] No camera attached, benchmarking the simulated device.")
+            make_device = lambda: SimulatedCamera(sensor_size=(1280, 720))
+        benchmark_shot_latency(
+            shots=5, make_device=make_device, height=720, width=1280, exposure_time=10000, whitebalance_auto='Off'
+        )
+        sys.exit(0)
+
     # CONFIGURE SETTINGS
     # NOTE: Ensure these values (Width, Height, ExposureTime, Gain) are within the valid range for your specific Basler camera model.
     camera_config = {
@@ -0,0 +1,64 @@
+# model/camera_roi.py
+# Sensor ROI around the dish, and moving coordinates between ROI and full-sensor frames.
+# An ROI is (offset_x, offset_y, width, height) in sensor pixels; None means the full sensor.
+import numpy as np
+
+
+def _align_down(value, inc):
+    return value - value % inc
+
+
+def _align_up(value, inc):
+    return -(-value // inc) * inc
+
+
+def dish_roi(circle, sensor_size, margin=40, increments=(2, 2, 2, 2), block_size=1):
+    """
+    Smallest sensor ROI holding the dish circle plus `margin` pixels.
+
+    sensor_size is (width, height); increments are the camera's
+    (Width, Height, OffsetX, OffsetY) steps. Offsets are kept even so a
+    Bayer pattern starts on the same color at any ROI, and are multiples of
+    block_size so block statistics see the same blocks as at full sensor.
+    """
+    x, y, r = circle
+    sensor_w, sensor_h = sensor_size
+    inc_w, inc_h, inc_x, inc_y = (max(2, inc) for inc in increments)
+    inc_x, inc_y = int(np.lcm(inc_x, block_size)), int(np.lcm(inc_y, block_size))
+
+    left = _align_down(max(0, int(np.floor(x - r - margin))), inc_x)
+    top = _align_down(max(0, int(np.floor(y - r - margin))), inc_y)
+    right = min(sensor_w, int(np.ceil(x + r + margin)))
+    bottom = min(sensor_h, int(np.ceil(y + r + margin)))
+
+    width = min(_align_up(right - left, inc_w), _align_down(sensor_w - left, inc_w))
+    height = min(_align_up(bottom - top, inc_h), _align_down(sensor_h - top, inc_h))
+    if (left, top, width, height) == (0, 0, sensor_w, sensor_h):
+        return None
+    return left, top, width, height
+
+
+def circle_to_roi(circle, roi):
+    """Full-sensor (x, y, r) -> coordinates within an ROI frame."""
+    if circle is None or roi is None:
+        return circle
+    x, y, r = circle
+    return x - roi[0], y - roi[1], r
+
+
+def circle_to_sensor(circle, roi):
+    """(x, y, r) found in an ROI frame -> full-sensor coordinates."""
+    if circle is None or roi is None:
+        return circle
+    x, y, r = circle
+    return x + roi[0], y + roi[1], r
+
+
+def pad_to_sensor(img, roi, sensor_size):
+    """Place an ROI frame back at its position in a black full-sensor frame (for saving)."""
+    if roi is None:
+        return img
+    offset_x, offset_y, width, height = roi
+    full = np.zeros((sensor_size[1], sensor_size[0], *img.shape[2:]), dtype=img.dtype)
+    full[offset_y:offset_y + height, offset_x:offset_x + width] = img
+    return full
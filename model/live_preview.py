@@ -0,0 +1,154 @@
+# model/live_preview.py
+# Live preview: a grab thread hands downscaled frames to the GUI through a
+# one-frame slot, so a slow GUI drops frames instead of queueing them.
+import threading
+import time
+
+import cv2
+
+from model.raw_frame import RawFrame
+
+
+class FrameSlot:
+    """One-frame handoff between the grab thread and the GUI."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        # A frame the GUI has not taken yet is replaced, and counted as dropped
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+
+    def take(self):
+        """The newest frame, or None if nothing new arrived. Never blocks on the grab."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        if frame is not None:
+            self.delivered += 1
+        return frame
+
+
+class LivePreview:
+    """
+    Grab thread feeding a FrameSlot at up to target_fps.
+
+    `grab` returns the newest camera frame (CameraModel.grab_latest in a
+    continuous session). Frames are downscaled to fit `size` on the grab
+    thread, so the GUI only has to wrap and show them.
+    """
+
+    def __init__(self, grab, size=(960, 540), target_fps=15.0, on_stop=None):
+        self.grab = grab
+        self.size = size
+        self.target_fps = target_fps
+        self.on_stop = on_stop
+        self.slot = FrameSlot()
+        self.grabbed = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="live-preview", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        if self.on_stop is not None:
+            self.on_stop()
+        print(f"[DEBUG] Live preview stopped: {self.stats()}")
+
+    def _downscale(self, frame):
+        if isinstance(frame, RawFrame):
+            return frame.preview(self.size)
+        h, w = frame.shape[:2]
+        scale = min(self.size[0] / w, self.size[1] / h)
+        if scale >= 1.0:
+            return frame
+        return cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+    def _run(self):
+        period = 1.0 / self.target_fps
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                frame = self.grab()
+            except Exception as e:
+                print(f"[DEBUG] Live preview grab failed: {e}")
+                frame = None
+
+            if frame is None:
+                self.errors += 1
+            else:
+                self.grabbed += 1
+                self.slot.put(self._downscale(frame))
+
+            # Pace to target_fps; wakes immediately on stop()
+            self._stop.wait(max(0.0, period - (time.perf_counter() - start)))
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "grabbed": self.grabbed,
+            "shown": self.slot.delivered,
+            "dropped": self.slot.dropped,
+            "errors": self.errors,
+            "fps": self.grabbed / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def start_live_preview(camera, size=(960, 540), target_fps=15.0):
+    """
+    Switch `camera` to a continuous (latest image only) session and start a preview.
+
+    Stopping the preview puts the camera back in the session mode it had before.
+    """
+    previous_mode = camera.session_mode
+    camera.start_session("continuous")
+
+    def restore():
+        camera.stop_session()
+        if previous_mode is not None:
+            camera.start_session(previous_mode)
+
+    return LivePreview(camera.grab_latest, size, target_fps, on_stop=restore).start()
+
+
+if __name__ == "__main__":
+    # Slow consumer against the simulated camera: frames are dropped, never queued
+    from model.backends import create_camera
+
+    camera = create_camera("simulated", {"grab_latency": 0.01}, height=1080, width=2100)
+    camera.start_session("trigger")
+    preview = camera.record_video(size=(640, 360), target_fps=30)
+
+    shown = []
+    end = time.perf_counter() + 3.0
+    while time.perf_counter() < end:
+        frame = preview.slot.take()
+        if frame is not None:
+            shown.append(frame.shape)
+        time.sleep(0.25)  # a GUI that only manages ~4 paints per second
+
+    preview.stop()
+    print(f"Shown frame shape {shown[-1]}, {preview.stats()}, camera back in {camera.session_mode!r} mode")
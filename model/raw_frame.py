@@ -0,0 +1,127 @@
+# model/raw_frame.py
+# Single-channel Bayer captures, debayered only when color is needed.
+import cv2
+import numpy as np
+
+# 2x2 colour layout per pylon pattern name (BayerGB8 -> "GB"): first row, second row
+BAYER_LAYOUTS = {
+    "RG": ("RG", "GB"),
+    "GB": ("GB", "RG"),
+    "GR": ("GR", "BG"),
+    "BG": ("BG", "GR"),
+}
+
+# OpenCV names Bayer codes after the second row, so pylon's GB is cv2's GR
+_CV2_DEBAYER = {
+    "RG": cv2.COLOR_BayerBG2BGR,
+    "GB": cv2.COLOR_BayerGR2BGR,
+    "GR": cv2.COLOR_BayerGB2BGR,
+    "BG": cv2.COLOR_BayerRG2BGR,
+}
+
+
+def _planes(bayer, pattern):
+    """The R, G1, G2 and B sub-images of a mosaic (each half resolution, as views)."""
+    layout = BAYER_LAYOUTS[pattern]
+    planes = {"G": []}
+    for r in range(2):
+        for c in range(2):
+            plane = bayer[r::2, c::2]
+            if layout[r][c] == "G":
+                planes["G"].append(plane)
+            else:
+                planes[layout[r][c]] = plane
+    return planes
+
+
+def bin_debayer(bayer, pattern):
+    """Half-resolution BGR: each 2x2 cell becomes one pixel (greens averaged)."""
+    planes = _planes(bayer, pattern)
+    g1, g2 = planes["G"]
+    green = ((g1.astype(np.uint16) + g2 + 1) >> 1).astype(np.uint8)
+    return cv2.merge([np.ascontiguousarray(planes["B"]), green, np.ascontiguousarray(planes["R"])])
+
+
+def mosaic(bgr, pattern="GB"):
+    """Bayer mosaic of a BGR image, as the sensor would deliver it (for tests and simulation)."""
+    layout = BAYER_LAYOUTS[pattern]
+    bayer = np.empty(bgr.shape[:2], dtype=bgr.dtype)
+    for r in range(2):
+        for c in range(2):
+            bayer[r::2, c::2] = bgr[r::2, c::2, "BGR".index(layout[r][c])]
+    return bayer
+
+
+class RawFrame:
+    """
+    A capture kept as the camera's Bayer buffer: one byte per pixel instead of three.
+
+    color() demosaics at full resolution for analysis and saving; preview()
+    and gray_preview() bin 2x2 cells instead, which is far cheaper and enough
+    for display and settle checks.
+    """
+
+    def __init__(self, bayer, pattern="GB"):
+        if bayer.ndim != 2:
+            raise ValueError(f"Bayer data must be single-channel, got shape {bayer.shape}")
+        if pattern not in BAYER_LAYOUTS:
+            raise ValueError(f"Unknown Bayer pattern {pattern!r}")
+        self.bayer = bayer
+        self.pattern = pattern
+
+    @property
+    def shape(self):
+        return self.bayer.shape
+
+    @property
+    def nbytes(self):
+        return self.bayer.nbytes
+
+    def color(self):
+        return cv2.cvtColor(self.bayer, _CV2_DEBAYER[self.pattern])
+
+    def preview(self, size=None):
+        """Binned BGR at half resolution, shrunk further to fit `size` (width, height) if given."""
+        bgr = bin_debayer(self.bayer, self.pattern)
+        if size is None:
+            return bgr
+        h, w = bgr.shape[:2]
+        scale = min(size[0] / w, size[1] / h)
+        if scale >= 1.0:
+            return bgr
+        return cv2.resize(bgr, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+    def gray_preview(self, scale=8):
+        """Downscaled luminance straight from the mosaic (scale must be even)."""
+        h, w = self.bayer.shape
+        return cv2.resize(self.bayer, (w // scale, h // scale), interpolation=cv2.INTER_AREA)
+
+
+def as_bgr(img):
+    """BGR array for analysis code: RawFrames are demosaiced, arrays pass through."""
+    if isinstance(img, RawFrame):
+        return img.color()
+    return img
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    bgr = cv2.GaussianBlur(rng.integers(0, 256, size=(2160, 4200, 3), dtype=np.uint8), (9, 9), 0)
+    raw = RawFrame(mosaic(bgr, "GB"), "GB")
+
+    def timed(fn, runs=10):
+        start = time.perf_counter()
+        for _ in range(runs):
+            out = fn()
+        return (time.perf_counter() - start) / runs * 1000, out
+
+    full_ms, full = timed(raw.color)
+    bin_ms, binned = timed(raw.preview)
+    gray_ms, _ = timed(raw.gray_preview)
+    error = np.abs(full[8:-8, 8:-8].astype(int) - bgr[8:-8, 8:-8]).mean()
+
+    print(f"Memory per capture: {raw.nbytes / 1e6:.1f} MB raw vs {bgr.nbytes / 1e6:.1f} MB BGR")
+    print(f"Full debayer {full_ms:.1f} ms (mean error {error:.2f}), 2x2 binned {bin_ms:.1f} ms {binned.shape}, "
+          f"gray preview {gray_ms:.1f} ms")
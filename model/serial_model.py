@@ -1,28 +1,48 @@
 # model/serial_model.py
-import serial, time
+import time
 from PyQt6.QtCore import QCoreApplication
 
 class SerialModel:
-    def __init__(self, port="COM9", baudrate=115200):
-        self.serial = serial.Serial(port, baudrate, timeout=1)
-        time.sleep(2)
+    def __init__(self, port="COM9", baudrate=115200, ack_timeout=None, transport=None):
+        # transport: an already open pyserial-like port (e.g. SimulatedSerialPort)
+        if transport is None:
+            import serial
+
+            self.serial = serial.Serial(port, baudrate, timeout=1)
+            # The controller resets when the port opens
+            time.sleep(2)
+        else:
+            self.serial = transport
         self.serial.reset_input_buffer()
+        # Seconds to wait for OK before giving up (None waits forever)
+        self.ack_timeout = ack_timeout
+        # Optional AcquisitionTimeline that records every command round trip
+        self.timeline = None
 
-    def send_and_wait_ok(self, message: str):
+    def send_and_wait_ok(self, message: str, timeout=None):
+        timeout = self.ack_timeout if timeout is None else timeout
+        start = time.perf_counter()
 
         self.serial.write((message + "\n").encode())
         print(f"[DEBUG] Sent: {message!r}")
 
-        while True:
-            QCoreApplication.processEvents()
+        try:
+            while True:
+                QCoreApplication.processEvents()
+
+                if timeout is not None and time.perf_counter() - start > timeout:
+                    raise TimeoutError(f"No OK for {message.strip()!r} within {timeout:.1f} s")
 
-            line = self.serial.readline().decode(errors='ignore').strip()
-            if line != "":
-                if line == "OK":
-                    return True
-                elif line.startswith("ERR"):
-                    raise RuntimeError(line)
-                else:
-                    continue
+                line = self.serial.readline().decode(errors='ignore').strip()
+                if line != "":
+                    if line == "OK":
+                        return True
+                    elif line.startswith("ERR"):
+                        raise RuntimeError(line)
+                    else:
+                        continue
 
-            time.sleep(0.01)
+                time.sleep(0.01)
+        finally:
+            if self.timeline is not None:
+                self.timeline.record(f"serial {message.strip()}", start, time.perf_counter())
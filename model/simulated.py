@@ -0,0 +1,354 @@
+# model/simulated.py
+# Hardware-free stand-ins for the Basler camera and the LED/motor controller,
+# for timing and regression runs off the rig.
+import glob
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+import pypylon.genicam as genicam
+import pypylon.pylon as pylon
+
+from model.raw_frame import mosaic
+
+# Dish radius seen by the camera at motor 0 (comminution) and 140 (mixing), see DISH_PROFILES
+DISH_RADIUS_PX = (1165, 765)
+MIXING_MOTOR = 140
+AUTO_MODES = ["Off", "Once", "Continuous"]
+PIXEL_TYPES = {"BayerGB8": pylon.PixelType_BayerGB8, "BGR8packed": pylon.PixelType_BGR8packed}
+
+
+class SimulatedRig:
+    """Shared state of the simulated rig: motor position and LED levels over time."""
+
+    def __init__(self, motor_speed=200.0, led_rise_time=0.05):
+        self.motor_speed = motor_speed          # motor steps per second
+        self.led_rise_time = led_rise_time      # seconds for an LED to reach full brightness
+        self.motor_position = 0
+        self.motor_target = 0
+        self.motor_done_at = 0.0
+        self.leds = np.zeros(17, dtype=np.int8)
+        self.led_changed_at = 0.0
+        self._lock = threading.Lock()
+
+    def move_motor(self, target):
+        with self._lock:
+            now = time.perf_counter()
+            self.motor_position = self.current_position(now)
+            self.motor_target = target
+            self.motor_done_at = now + abs(target - self.motor_position) / self.motor_speed
+            return self.motor_done_at - now
+
+    def current_position(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if now >= self.motor_done_at:
+            return self.motor_target
+        remaining = (self.motor_done_at - now) * self.motor_speed
+        return self.motor_target - np.sign(self.motor_target - self.motor_position) * remaining
+
+    def toggle_leds(self, pattern):
+        # Like the firmware, a 1 toggles that channel
+        with self._lock:
+            self.leds ^= np.asarray(pattern, dtype=np.int8)
+            self.led_changed_at = time.perf_counter()
+
+    def illumination(self, now=None):
+        """Fraction of full brightness: lit main LEDs (channels 0, 4, 8, 12) with rise time."""
+        now = time.perf_counter() if now is None else now
+        lit = int(self.leds[[0, 4, 8, 12]].sum())
+        rise = min(1.0, (now - self.led_changed_at) / self.led_rise_time) if self.led_rise_time > 0 else 1.0
+        return (0.25 + 0.75 * rise) * lit / 4.0
+
+
+class SimulatedSerialPort:
+    """
+    pyserial-compatible port that answers like the firmware.
+
+    "led" followed by 17 zeros/ones toggles the LEDs and "motor N" moves the
+    motor; both reply OK after ack_delay (motor moves also wait for the motion
+    when ack_after_motion is set). Anything else gets "ERR unknown command".
+    """
+
+    def __init__(self, rig=None, ack_delay=0.01, ack_after_motion=False, timeout=1):
+        self.rig = rig or SimulatedRig()
+        self.ack_delay = ack_delay
+        self.ack_after_motion = ack_after_motion
+        self.timeout = timeout
+        self._replies = deque()
+
+    def write(self, data):
+        for line in data.decode(errors="ignore").splitlines():
+            line = line.strip()
+            if line:
+                delay, reply = self._handle(line)
+                self._replies.append((time.perf_counter() + delay, reply))
+        return len(data)
+
+    def _handle(self, command):
+        parts = command.split()
+
+        if parts[0] == "led" and len(parts) == 18 and all(p in ("0", "1") for p in parts[1:]):
+            self.rig.toggle_leds([int(p) for p in parts[1:]])
+            return self.ack_delay, "OK"
+
+        if parts[0] == "motor" and len(parts) == 2 and parts[1].lstrip("-").isdigit():
+            motion = self.rig.move_motor(int(parts[1]))
+            return self.ack_delay + (motion if self.ack_after_motion else 0.0), "OK"
+
+        return self.ack_delay, "ERR unknown command"
+
+    def readline(self):
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline:
+            if self._replies and self._replies[0][0] <= time.perf_counter():
+                return (self._replies.popleft()[1] + "\n").encode()
+            time.sleep(0.001)
+        return b""
+
+    def reset_input_buffer(self):
+        self._replies.clear()
+
+    def close(self):
+        pass
+
+
+class SimulatedNode:
+    """GenICam-style node: GetValue/SetValue with the range, increment and enum checks of a camera."""
+
+    def __init__(self, device, name, value, minimum=None, maximum=None, inc=None, symbolics=None, fixed_while_grabbing=False):
+        self.device = device
+        self.name = name
+        self.value = value
+        self.Inc = inc
+        self.Symbolics = symbolics or []
+        self._minimum = minimum
+        self._maximum = maximum
+        self._fixed_while_grabbing = fixed_while_grabbing
+
+    def GetMin(self):
+        return self._minimum
+
+    def GetMax(self):
+        # A callable maximum depends on another node (e.g. Width on OffsetX)
+        return self._maximum() if callable(self._maximum) else self._maximum
+
+    def GetValue(self):
+        return self.value
+
+    def SetValue(self, value):
+        if self._fixed_while_grabbing and self.device.IsGrabbing():
+            raise genicam.AccessException(f"Node {self.name} is not writable while grabbing")
+        if self.Symbolics:
+            if value not in self.Symbolics:
+                raise genicam.OutOfRangeException(f"{value!r} is not a valid {self.name}")
+        elif not self.GetMin() <= value <= self.GetMax():
+            raise genicam.OutOfRangeException(f"{self.name} {value} outside [{self.GetMin()}, {self.GetMax()}]")
+        elif self.Inc and (value - self.GetMin()) % self.Inc:
+            raise genicam.OutOfRangeException(f"{self.name} {value} is not a multiple of {self.Inc}")
+        self.value = value
+        self.device.node_writes += 1
+
+
+class SimulatedGrabResult(pylon.PylonImage):
+    """A PylonImage with the grab result calls CameraModel makes."""
+
+    ErrorCode = 0
+    ErrorDescription = ""
+
+    def GrabSucceeded(self):
+        return self.IsValid()
+
+
+class SimulatedCamera:
+    """
+    Stand-in for a pylon InstantCamera, for CameraModel(device=...).
+
+    It has the nodes and grab calls CameraModel uses, so CameraModel's own
+    settings, ROI, profile, session and conversion code runs on it. With
+    `source` (a folder or glob of images) the files are served in turn;
+    otherwise frames are rendered from the rig state at exposure start: a
+    dish whose size follows the motor position, moving while the motor runs,
+    lit by the LEDs. A frame is ready grab_latency (scaled by the share of
+    the sensor read out) plus the exposure time after its trigger; a
+    free-running stream delivers one frame per that period, or per
+    1/AcquisitionFrameRate when that is enabled and slower.
+    """
+
+    def __init__(self, sensor_size=(4200, 2160), source=None, grab_latency=0.03, rig=None, seed=0):
+        sensor_w, sensor_h = sensor_size
+        self.sensor_size = sensor_size
+        self.grab_latency = grab_latency
+        self.rig = rig or SimulatedRig()
+        self.node_writes = 0
+
+        self.PixelFormat = SimulatedNode(self, "PixelFormat", "BayerGB8", symbolics=list(PIXEL_TYPES), fixed_while_grabbing=True)
+        self.Width = SimulatedNode(self, "Width", sensor_w, 16, lambda: sensor_w - self.OffsetX.value, 4, fixed_while_grabbing=True)
+        self.Height = SimulatedNode(self, "Height", sensor_h, 16, lambda: sensor_h - self.OffsetY.value, 2, fixed_while_grabbing=True)
+        self.OffsetX = SimulatedNode(self, "OffsetX", 0, 0, lambda: sensor_w - self.Width.value, 4)
+        self.OffsetY = SimulatedNode(self, "OffsetY", 0, 0, lambda: sensor_h - self.Height.value, 2)
+        self.ExposureTime = SimulatedNode(self, "ExposureTime", 5000.0, 20.0, 10_000_000.0)
+        self.Gain = SimulatedNode(self, "Gain", 0.0, 0.0, 24.0)
+        self.ExposureAuto = SimulatedNode(self, "ExposureAuto", "Off", symbolics=AUTO_MODES)
+        self.GainAuto = SimulatedNode(self, "GainAuto", "Off", symbolics=AUTO_MODES)
+        self.BalanceWhiteAuto = SimulatedNode(self, "BalanceWhiteAuto", "Off", symbolics=AUTO_MODES)
+        self.MaxNumBuffer = SimulatedNode(self, "MaxNumBuffer", 10, 1, 1024, 1)
+        self.TriggerSelector = SimulatedNode(self, "TriggerSelector", "FrameStart", symbolics=["FrameStart", "FrameBurstStart"])
+        self.TriggerMode = SimulatedNode(self, "TriggerMode", "Off", symbolics=["Off", "On"])
+        self.TriggerSource = SimulatedNode(self, "TriggerSource", "Software", symbolics=["Software", "Line1"])
+        self.AcquisitionFrameRateEnable = SimulatedNode(self, "AcquisitionFrameRateEnable", False, symbolics=[False, True])
+        self.AcquisitionFrameRate = SimulatedNode(self, "AcquisitionFrameRate", 100.0, 1.0, 1000.0)
+
+        self._files = []
+        if source:
+            pattern = os.path.join(source, "*.png") if os.path.isdir(source) else source
+            self._files = sorted(glob.glob(pattern))
+        self._next_file = 0
+        self._rng = np.random.default_rng(seed)
+        self._scene = None
+        self._noise = None
+        # Rendered frames by (position, illumination, exposure, ROI, format); a still dish is drawn once
+        self._frames = {}
+        self._open = False
+        self._grabbing = False
+        self._triggers = deque()
+        self._next_frame_at = 0.0
+
+    # -------------------------------------------------------------
+    # InstantCamera calls
+    # -------------------------------------------------------------
+    def Open(self):
+        self._open = True
+
+    def IsOpen(self):
+        return self._open
+
+    def Close(self):
+        self.StopGrabbing()
+        self._open = False
+
+    def IsGrabbing(self):
+        return self._grabbing
+
+    def StartGrabbing(self, strategy=pylon.GrabStrategy_OneByOne):
+        if not self._open:
+            raise pylon.RuntimeException("Camera is not open")
+        self._grabbing = True
+        self._triggers.clear()
+        self._next_frame_at = time.perf_counter() + self._frame_period()
+
+    def StopGrabbing(self):
+        self._grabbing = False
+        self._triggers.clear()
+
+    def WaitForFrameTriggerReady(self, timeout_ms, handling=pylon.TimeoutHandling_ThrowException):
+        return self._grabbing
+
+    def ExecuteSoftwareTrigger(self):
+        if self.TriggerMode.value == "On" and self.TriggerSource.value == "Software":
+            self._triggers.append(time.perf_counter())
+
+    def RetrieveResult(self, timeout_ms, handling=pylon.TimeoutHandling_ThrowException):
+        if not self._grabbing:
+            raise pylon.RuntimeException("RetrieveResult called while not grabbing")
+        now = time.perf_counter()
+        period = self._frame_time()
+
+        if self.TriggerMode.value == "On":
+            ready_at = self._triggers[0] + period if self._triggers else None
+        else:
+            ready_at = self._next_frame_at
+            if ready_at <= now:
+                # Free-running: the newest frame finished so far
+                ready_at += (now - ready_at) // self._frame_period() * self._frame_period()
+
+        if ready_at is None or ready_at - now > timeout_ms / 1000:
+            time.sleep(timeout_ms / 1000)
+            if handling == pylon.TimeoutHandling_ThrowException:
+                raise pylon.TimeoutException(f"Grab timed out after {timeout_ms} ms")
+            return SimulatedGrabResult()
+
+        if self.TriggerMode.value == "On":
+            self._triggers.popleft()
+        else:
+            self._next_frame_at = ready_at + self._frame_period()
+
+        result = SimulatedGrabResult()
+        result.AttachArray(self._frame(ready_at - period), PIXEL_TYPES[self.PixelFormat.value])
+        # Only the part of the frame time not spent rendering is slept
+        delay = ready_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return result
+
+    # -------------------------------------------------------------
+    # Frame source
+    # -------------------------------------------------------------
+    def _frame_time(self):
+        # Transfer time scales with the pixels read out, as over USB
+        sensor_w, sensor_h = self.sensor_size
+        fraction = self.Width.value * self.Height.value / (sensor_w * sensor_h)
+        return self.grab_latency * fraction + self.ExposureTime.value / 1e6
+
+    def _frame_period(self):
+        # Free-running streams are held to AcquisitionFrameRate when it is enabled
+        if self.AcquisitionFrameRateEnable.value:
+            return max(self._frame_time(), 1.0 / self.AcquisitionFrameRate.value)
+        return self._frame_time()
+
+    def _frame(self, exposed_at):
+        roi = (self.OffsetX.value, self.OffsetY.value, self.Width.value, self.Height.value)
+        pixel_format = self.PixelFormat.value
+
+        if self._files:
+            path = self._files[self._next_file % len(self._files)]
+            self._next_file += 1
+            key = (path, roi, pixel_format)
+        else:
+            position = round(float(self.rig.current_position(exposed_at)))
+            illumination = round(self.rig.illumination(exposed_at), 2)
+            key = (position, illumination, self.ExposureTime.value, roi, pixel_format)
+
+        frame = self._frames.get(key)
+        if frame is None:
+            if len(self._frames) >= 32:
+                self._frames.pop(next(iter(self._frames)))
+            offset_x, offset_y, width, height = roi
+            if self._files:
+                img = cv2.imread(path)[offset_y:offset_y + height, offset_x:offset_x + width]
+            else:
+                img = self._render(position, illumination, self.ExposureTime.value, roi)
+            frame = mosaic(img, pixel_format[5:7]) if pixel_format.startswith("Bayer") else np.ascontiguousarray(img)
+            self._frames[key] = frame
+        return frame
+
+    def _render(self, position, illumination, exposure_time, roi):
+        """Synthetic frame of the sensor ROI; nothing outside it is drawn."""
+        sensor_w, sensor_h = self.sensor_size
+        if self._scene is None:
+            # Static texture: particles scattered over the dish area, and the sensor noise, made once
+            self._scene = np.zeros((sensor_h, sensor_w, 3), dtype=np.uint8)
+            for _ in range(400):
+                center = (int(self._rng.integers(0, sensor_w)), int(self._rng.integers(0, sensor_h)))
+                cv2.circle(self._scene, center, int(self._rng.integers(3, 14)), (150, 40, 100), -1)
+            self._noise = self._rng.integers(0, 4, size=self._scene.shape, dtype=np.uint8)
+
+        near, far = DISH_RADIUS_PX
+        radius = int(near + (far - near) * position / MIXING_MOTOR)
+        # The dish and its contents slide sideways while the motor is still moving
+        shift = int(4 * (position - self.rig.motor_target))
+        offset_x, offset_y, width, height = roi
+        rows = slice(offset_y, offset_y + height)
+        cols = slice(offset_x, offset_x + width)
+
+        img = np.full((height, width, 3), 20, dtype=np.uint8)
+        center = (sensor_w // 2 + shift - offset_x, sensor_h // 2 - offset_y)
+        cv2.circle(img, center, max(radius, 10), (150, 150, 150), -1)
+        img = cv2.subtract(img, np.roll(self._scene[rows], shift, axis=1)[:, cols])
+
+        gain = illumination * exposure_time / 6534.0
+        img = cv2.convertScaleAbs(img, alpha=min(gain, 4.0))
+        return cv2.add(img, self._noise[rows, cols])
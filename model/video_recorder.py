@@ -0,0 +1,361 @@
+# model/video_recorder.py
+# Disk recording: a grab thread copies frames into a ring of pre-allocated
+# buffers and a separate writer thread encodes them, so a slow disk or codec
+# drops (and counts) frames instead of stalling the camera.
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from model.raw_frame import RawFrame
+
+CONTAINERS = ("raw", "lossless")
+
+
+def measured_fps(timestamps):
+    """Mean frame rate of a recording from its per-frame timestamps (0.0 below two frames)."""
+    if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+        return 0.0
+    return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+
+
+class RawChunkWriter:
+    """
+    Frames appended unencoded to fixed-size chunk files.
+
+    `<path>/chunk_00000.raw` holds chunk_frames frames back to back;
+    `<path>/index.json` records shape, dtype and per-frame timestamps.
+    Cheapest to write, read back with read_raw_frames().
+    """
+
+    def __init__(self, path, shape, dtype=np.uint8, fps=30.0, chunk_frames=100, bayer_pattern=None):
+        self.path = path
+        self.bayer_pattern = bayer_pattern
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fps = fps
+        self.chunk_frames = chunk_frames
+        self.timestamps = []
+        self._file = None
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, frame, timestamp):
+        if len(self.timestamps) % self.chunk_frames == 0:
+            if self._file is not None:
+                self._file.close()
+            chunk = len(self.timestamps) // self.chunk_frames
+            self._file = open(os.path.join(self.path, f"chunk_{chunk:05d}.raw"), "wb")
+        self._file.write(memoryview(frame).cast("B"))
+        self.timestamps.append(timestamp)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(os.path.join(self.path, "index.json"), "w") as f:
+            json.dump(
+                {
+                    "shape": self.shape,
+                    "dtype": self.dtype.str,
+                    "fps": self.fps,
+                    "measured_fps": measured_fps(self.timestamps),
+                    "chunk_frames": self.chunk_frames,
+                    "bayer_pattern": self.bayer_pattern,
+                    "timestamps": self.timestamps,
+                },
+                f,
+            )
+
+
+def read_raw_frames(path):
+    """
+    Yield (frame, timestamp) from a RawChunkWriter recording, memory-mapped.
+    Bayer recordings yield RawFrames.
+    """
+    with open(os.path.join(path, "index.json")) as f:
+        index = json.load(f)
+    shape, dtype = tuple(index["shape"]), np.dtype(index["dtype"])
+
+    for i, timestamp in enumerate(index["timestamps"]):
+        chunk, offset = divmod(i, index["chunk_frames"])
+        frames = np.memmap(
+            os.path.join(path, f"chunk_{chunk:05d}.raw"), dtype=dtype, mode="r"
+        ).reshape(-1, *shape)
+        frame = frames[offset]
+        if index.get("bayer_pattern"):
+            frame = RawFrame(frame, index["bayer_pattern"])
+        yield frame, timestamp
+
+
+class LosslessVideoWriter:
+    """FFV1 in Matroska through cv2.VideoWriter: lossless and about 2-3x smaller than raw."""
+
+    def __init__(self, path, shape, dtype=np.uint8, fps=30.0):
+        if np.dtype(dtype) != np.uint8:
+            raise ValueError("Lossless video needs 8-bit frames")
+        if not path.endswith(".mkv"):
+            path += ".mkv"
+        self.path = path
+        h, w = shape[:2]
+        is_color = len(shape) == 3
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"FFV1"), fps, (w, h), is_color)
+        if not self._writer.isOpened():
+            raise RuntimeError(f"OpenCV cannot write FFV1 video to {path}")
+        self.timestamps = []
+
+    def write(self, frame, timestamp):
+        self._writer.write(frame)
+        self.timestamps.append(timestamp)
+
+    def close(self):
+        self._writer.release()
+        with open(self.path + ".timestamps.json", "w") as f:
+            json.dump(self.timestamps, f)
+
+
+def create_writer(container, path, shape, dtype=np.uint8, fps=30.0, bayer_pattern=None):
+    if container == "raw":
+        return RawChunkWriter(path, shape, dtype, fps, bayer_pattern=bayer_pattern)
+    if container == "lossless":
+        # Bayer frames are stored as grayscale video; the pattern goes in the file name
+        if bayer_pattern is not None:
+            path = f"{path}_bayer{bayer_pattern}"
+        return LosslessVideoWriter(path, shape, dtype, fps)
+    raise ValueError(f"Unknown container {container!r}, expected one of {CONTAINERS}")
+
+
+class VideoRecorder:
+    """
+    Grab thread -> ring of ring_frames pre-allocated buffers -> writer thread.
+
+    `grab` returns the next camera frame (all frames must share one shape).
+    Grabs are paced to one per 1/fps, the rate stored in the file; slots the
+    camera could not fill in time are counted as late. When every buffer is
+    waiting for the writer, the new frame is dropped and counted; grabbing
+    itself never waits on the disk. The ring is allocated once, sized by the
+    first frame.
+    """
+
+    def __init__(self, grab, path, container="raw", ring_frames=16, fps=30.0, on_stop=None):
+        if container not in CONTAINERS:
+            raise ValueError(f"Unknown container {container!r}, expected one of {CONTAINERS}")
+        self.grab = grab
+        self.path = path
+        self.container = container
+        self.ring_frames = ring_frames
+        self.fps = fps
+        self.on_stop = on_stop
+
+        self.grabbed = 0
+        self.written = 0
+        self.dropped = 0
+        self.late = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self.max_queue_depth = 0
+        self.error = None
+
+        self._ring = None
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+        self._started_at = None
+        self._stopped_at = None
+        self._timestamps = []
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    @property
+    def queue_depth(self):
+        return self._filled.qsize()
+
+    def start(self):
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._grab_loop, name="recorder-grab", daemon=True),
+        ]
+        self._threads[0].start()
+        return self
+
+    def _allocate(self, frame, bayer_pattern):
+        self._ring = np.empty((self.ring_frames, *frame.shape), dtype=frame.dtype)
+        for i in range(self.ring_frames):
+            self._free.put(i)
+        writer = create_writer(self.container, self.path, frame.shape, frame.dtype, self.fps, bayer_pattern)
+        thread = threading.Thread(target=self._write_loop, args=(writer,), name="recorder-write", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _grab_loop(self):
+        period = 1.0 / self.fps
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            # One frame per period, so playback at the stored fps matches real time
+            if self._stop.wait(max(0.0, next_at - time.perf_counter())):
+                break
+            next_at += period
+            if time.perf_counter() > next_at:
+                # The camera fell behind; start a fresh schedule rather than bursting to catch up
+                self.late += 1
+                next_at = time.perf_counter()
+
+            try:
+                frame = self.grab()
+            except Exception as e:
+                print(f"[DEBUG] Recording grab failed: {e}")
+                frame = None
+            if frame is None:
+                self.errors += 1
+                continue
+            timestamp = time.perf_counter() - self._started_at
+            self.grabbed += 1
+            self._timestamps.append(timestamp)
+
+            # Bayer frames are recorded as they come off the sensor, a third of the BGR size
+            bayer_pattern = None
+            if isinstance(frame, RawFrame):
+                frame, bayer_pattern = frame.bayer, frame.pattern
+
+            if self._ring is None:
+                try:
+                    self._allocate(frame, bayer_pattern)
+                except (OSError, RuntimeError, ValueError) as e:
+                    self.error = str(e)
+                    print(f"[DEBUG] Recording could not start: {e}")
+                    return
+            try:
+                slot = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                continue
+
+            np.copyto(self._ring[slot], frame)
+            self._filled.put((slot, timestamp))
+            self.max_queue_depth = max(self.max_queue_depth, self._filled.qsize())
+
+        # Tell the writer that nothing more is coming
+        self._filled.put(None)
+
+    def _write_loop(self, writer):
+        try:
+            while True:
+                item = self._filled.get()
+                if item is None:
+                    break
+                slot, timestamp = item
+                writer.write(self._ring[slot], timestamp)
+                self.bytes_written += self._ring[slot].nbytes
+                self.written += 1
+                self._free.put(slot)
+        except Exception as e:
+            # Nothing more can be written; stop the grab side too
+            self.error = str(e)
+            self._stop.set()
+            print(f"[DEBUG] Recording writer failed: {e}")
+        finally:
+            writer.close()
+
+    def stop(self):
+        """Stop grabbing, let the writer finish the queued frames, and return the stats."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._stopped_at = time.perf_counter()
+        if self.on_stop is not None:
+            self.on_stop()
+        stats = self.stats()
+        print(f"[DEBUG] Recording stopped: {stats}")
+        if stats["fps"] < 0.95 * self.fps:
+            print(f"[DEBUG] Recorded at {stats['fps']:.1f} fps, below the {self.fps:g} fps stored in the file.")
+        return stats
+
+    def stats(self):
+        end = self._stopped_at or time.perf_counter()
+        elapsed = end - self._started_at if self._started_at else 0.0
+        return {
+            "grabbed": self.grabbed,
+            "written": self.written,
+            "dropped": self.dropped,
+            "late": self.late,
+            "errors": self.errors,
+            "fps": measured_fps(self._timestamps),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "mb_per_s": self.bytes_written / 1e6 / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def start_recording(camera, path, container="raw", ring_frames=16, fps=30.0):
+    """
+    Record `camera` in a continuous session until the returned recorder's stop().
+    The camera free-runs at `fps` where it supports it, and the grab loop is
+    paced to it either way. The previous session mode is restored afterwards.
+    """
+    previous_mode = camera.session_mode
+    camera.stop_session()
+    camera.set_frame_rate(fps)
+    camera.start_session("continuous")
+
+    def restore():
+        camera.stop_session()
+        camera.set_frame_rate(None)
+        if previous_mode is not None:
+            camera.start_session(previous_mode)
+
+    return VideoRecorder(camera.grab_latest, path, container, ring_frames, fps, on_stop=restore).start()
+
+
+if __name__ == "__main__":
+    # Stress test: a synthetic full-resolution source at a fixed frame rate
+    import argparse
+    import shutil
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Recording stress benchmark with synthetic frames.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--width", type=int, default=4200)
+    parser.add_argument("--ring-frames", type=int, default=16)
+    parser.add_argument("--container", choices=CONTAINERS, action="append")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # A few distinct frames, so encoders cannot exploit identical input
+    frames = [rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+
+    for container in args.container or CONTAINERS:
+        count = [0]
+        next_at = [time.perf_counter()]
+
+        def synthetic_grab():
+            # Like a free-running camera: one frame every 1/fps seconds
+            next_at[0] += 1.0 / args.fps
+            delay = next_at[0] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            count[0] += 1
+            return frames[count[0] % len(frames)]
+
+        out_dir = tempfile.mkdtemp(prefix="pmes-record-")
+        recorder = VideoRecorder(
+            synthetic_grab, os.path.join(out_dir, "video"), container, args.ring_frames, args.fps
+        ).start()
+        time.sleep(args.seconds)
+        stats = recorder.stop()
+        shutil.rmtree(out_dir)
+
+        print(
+            f"{container:<9} {stats['grabbed']} grabbed at {stats['fps']:.1f} fps, {stats['written']} written, "
+            f"{stats['dropped']} dropped, {stats['late']} late, "
+            f"max queue {stats['max_queue_depth']}/{args.ring_frames}, {stats['mb_per_s']:.0f} MB/s sustained"
+        )
@@ -0,0 +1,93 @@
+# startup_benchmark.py
+# Time-to-first-paint of app.py and the import cost of what it loads at startup.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def import_costs(module="controller.main_controller"):
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns (total_ms, per_package_ms, own_modules_ms): self time summed per
+    top-level package, and the cumulative time of each controller/view/model
+    module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    per_package = {}
+    own_modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative, name = line.split("|")
+        self_us = int(head.split(":")[1])
+        name = name.strip()
+
+        package = name.split(".")[0]
+        per_package[package] = per_package.get(package, 0.0) + self_us / 1000.0
+        if package in ("controller", "view", "model", "configs"):
+            own_modules[name] = int(cumulative) / 1000.0
+
+    return sum(per_package.values()), per_package, own_modules
+
+
+def first_paint(runs=3, timeout=60):
+    """Median time from process start to the first painted main window, in seconds."""
+    env = dict(os.environ, PMES_STARTUP_BENCHMARK="1")
+    in_process, wall = [], []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "app.py"], capture_output=True, text=True, env=env, timeout=timeout
+        )
+        elapsed = time.perf_counter() - start
+
+        lines = [l for l in result.stdout.splitlines() if l.startswith("[STARTUP] first paint")]
+        if not lines:
+            raise RuntimeError(f"app.py did not report its first paint:\n{result.stderr.strip()}")
+        in_process.append(float(lines[0].split()[3]))
+        wall.append(elapsed)
+
+    return statistics.median(in_process), statistics.median(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure PMES GUI startup time.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="packages to list by import cost")
+    parser.add_argument("--budget", type=float, default=1.5, help="first-paint budget in seconds")
+    parser.add_argument("--imports-only", action="store_true", help="skip launching the GUI")
+    args = parser.parse_args()
+
+    total_ms, per_package, own_modules = import_costs()
+    print(f"Import of controller.main_controller: {total_ms:.0f} ms")
+    for package, ms in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<24} {ms:8.1f} ms")
+    print("Own modules (cumulative):")
+    for name, ms in sorted(own_modules.items(), key=lambda item: -item[1]):
+        print(f"  {name:<40} {ms:8.1f} ms")
+
+    if args.imports_only:
+        return
+
+    in_process, wall = first_paint(args.runs)
+    print(f"First paint: {in_process:.3f} s after app.py started, {wall:.3f} s wall clock including interpreter and exit")
+
+    if in_process > args.budget:
+        print(f"Startup over budget ({in_process:.3f} s > {args.budget:.3f} s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# view/frame_display.py
+# NumPy frame -> QPixmap for a QLabel with as few full-size copies as possible.
+import cv2
+import numpy as np
+from PyQt6 import QtGui
+
+
+def fit_frame(image, width, height):
+    """
+    Downscale `image` to fit in width x height, keeping the aspect ratio.
+
+    INTER_AREA runs once on the full frame and the result is a new contiguous
+    array, so a strided or reversed view can be passed in without copying it
+    first. Frames that already fit are returned as they are.
+    """
+    h, w = image.shape[:2]
+    scale = min(width / w, height / h)
+    if scale >= 1.0:
+        return np.ascontiguousarray(image)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def wrap_qimage(frame):
+    """
+    QImage over the memory of `frame` (8-bit gray or BGR), without copying.
+
+    The QImage does not own the buffer: `frame` must stay alive (and unchanged)
+    for as long as the QImage is used.
+    """
+    if frame.dtype != np.uint8:
+        raise ValueError(f"Unsupported image dtype: {frame.dtype}")
+    if not frame.flags["C_CONTIGUOUS"]:
+        raise ValueError("Frame must be C-contiguous to be wrapped")
+
+    if frame.ndim == 2:
+        fmt = QtGui.QImage.Format.Format_Grayscale8
+    elif frame.ndim == 3 and frame.shape[2] == 3:
+        fmt = QtGui.QImage.Format.Format_BGR888
+    else:
+        raise ValueError(f"Unsupported image format: {frame.shape}")
+
+    h, w = frame.shape[:2]
+    return QtGui.QImage(frame.data, w, h, frame.strides[0], fmt)
+
+
+def frame_to_pixmap(image, width, height):
+    """
+    Pixmap of `image` fitted to width x height.
+
+    Returns (pixmap, bytes_copied). Only the downscaled frame and the pixmap
+    are allocated; the QImage in between is a view of the downscaled buffer,
+    which is kept referenced here until QPixmap.fromImage has taken its copy.
+    """
+    frame = fit_frame(image, width, height)
+    q_img = wrap_qimage(frame)
+    pixmap = QtGui.QPixmap.fromImage(q_img)
+    del q_img  # the QImage must not outlive `frame`
+
+    bytes_copied = (frame.nbytes if frame is not image else 0) + pixmap.width() * pixmap.height() * pixmap.depth() // 8
+    return pixmap, bytes_copied
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    from PyQt6 import QtCore, QtWidgets
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication(sys.argv)
+
+    frame = np.random.default_rng(0).integers(0, 256, size=(2160, 4200, 3), dtype=np.uint8)
+    label_w, label_h = 640, 360
+    runs = 20
+
+    def previous_path(image):
+        # What visualize_image used to do: two full-size copies and a full-size smooth scale
+        rgb = image[:, :, ::-1].copy(order="C")
+        data = rgb.data.tobytes()
+        q_img = QtGui.QImage(data, image.shape[1], image.shape[0], 3 * image.shape[1], QtGui.QImage.Format.Format_RGB888)
+        pixmap = QtGui.QPixmap.fromImage(q_img)
+        scaled = pixmap.scaled(
+            label_w, label_h, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation
+        )
+        copied = rgb.nbytes + len(data) + pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        return scaled, copied + scaled.width() * scaled.height() * scaled.depth() // 8
+
+    for name, display in (("previous", previous_path), ("fitted", lambda img: frame_to_pixmap(img, label_w, label_h))):
+        start = time.perf_counter()
+        for _ in range(runs):
+            pixmap, copied = display(frame)
+        ms = (time.perf_counter() - start) / runs * 1000
+        print(f"{name:<9} {ms:7.1f} ms/frame, {copied / 1e6:6.1f} MB copied, pixmap {pixmap.width()}x{pixmap.height()}")
@@ -2,8 +2,6 @@
 from PyQt6 import QtWidgets
 from PyQt6.uic import loadUi
 from PyQt6 import QtGui, QtCore
-from matplotlib.backends.backend_agg import FigureCanvasAgg
-import numpy as np
 import os
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -61,76 +59,29 @@ class MainWindow(QtWidgets.QMainWindow):
             print(text)
 
     def visualize_image(self, image, q_label):
-            """
-            Displays a NumPy array (image) in a QLabel (q_label).
-            Handles 8-bit grayscale and 24-bit BGR (converts to RGB).
-            """
-            if image is None:
-                return
-
-            # Ensure the image array is C-contiguous. 
-            # QImage needs a contiguous memory buffer.
-            if not image.flags['C_CONTIGUOUS']:
-                image = image.copy(order='C')
-
-            q_img = None
-
-            if len(image.shape) == 2:
-                # Grayscale image (H, W)
-                h, w = image.shape
-                data = image.data
-
-                q_img = QtGui.QImage(
-                    data.tobytes(), # Convert memoryview to bytes
-                    w,
-                    h,
-                    w, # bytesPerLine = width (1 byte per pixel)
-                    QtGui.QImage.Format.Format_Grayscale8
-                )
-
-            elif len(image.shape) == 3:
-                # Color image (H, W, CH). Assuming BGR input from common libraries like OpenCV.
-                # Convert BGR (NumPy default) to RGB (QImage default)
-                rgb = image[:, :, ::-1] 
-                
-                # The slicing operation (::-1) makes the array non-contiguous. 
-                # Must copy the data into a C-contiguous buffer before passing to QImage.
-                rgb_contiguous = rgb.copy(order='C') 
-
-                h, w, ch = rgb_contiguous.shape
-                bytes_per_line = ch * w
-
-                q_img = QtGui.QImage(
-                    rgb_contiguous.data.tobytes(), # Convert memoryview to bytes
-                    w,
-                    h,
-                    bytes_per_line,
-                    QtGui.QImage.Format.Format_RGB888
-                )
-
-            else:
-                self.show_error(f"Unsupported image format: {image.shape}")
-                return
-
-            if q_img:
-                # Convert QImage to QPixmap for display
-                pixmap = QtGui.QPixmap.fromImage(q_img)
-
-                # Scale the pixmap to fit the QLabel while maintaining aspect ratio
-                pixmap = pixmap.scaled(
-                    q_label.width(),
-                    q_label.height(),
-                    QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                    QtCore.Qt.TransformationMode.SmoothTransformation
-                )
-
-                # Display the scaled image
-                q_label.setPixmap(pixmap)
+        """
+        Displays a NumPy array (8-bit grayscale or BGR) in a QLabel.
+        The frame is downscaled to the label first and wrapped without a BGR->RGB copy.
+        """
+        if image is None:
+            return
+
+        from view.frame_display import frame_to_pixmap
+
+        try:
+            pixmap, _ = frame_to_pixmap(image, q_label.width(), q_label.height())
+        except ValueError as e:
+            self.show_error(str(e))
+            return
+
+        q_label.setPixmap(pixmap)
 
     def visualize_figure(self, fig, q_label, dpi=500):
         """
         Render matplotlib normally, then scale to QLabel.
         """
+        import numpy as np
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
 
         # --- Make figure high-res ---
         fig.set_dpi(dpi)
@@ -169,6 +120,11 @@ class MainWindow(QtWidgets.QMainWindow):
         list_widget: QtWidgets.QListWidget,
         bin_size=0.01
     ):
+        import numpy as np
+
+        # Accept the particle table from measure_particles as well as a plain array
+        if isinstance(particle_sizes, dict):
+            particle_sizes = particle_sizes["eq_diameter_mm"]
         particle_sizes = np.asarray(particle_sizes)
 
         if particle_sizes.size == 0: